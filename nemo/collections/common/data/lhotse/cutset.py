@@ -14,10 +14,11 @@
 
 import logging
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from itertools import repeat
 from pathlib import Path
-from typing import KeysView, Mapping, Sequence, Tuple, Union
+from typing import Iterable, KeysView, Mapping, Sequence, Tuple, Union
 
 import omegaconf
 from lhotse import CutSet, Features, Recording
@@ -25,6 +26,7 @@ from lhotse.array import Array, TemporalArray
 from lhotse.cut import Cut, MixedCut, PaddingCut
 from omegaconf import DictConfig, ListConfig, OmegaConf
 
+from nemo.collections.common.data.lhotse.iterators import LazyPrefetchingIterator
 from nemo.collections.common.data.lhotse.nemo_adapters import (
     LazyNeMoIterator,
     LazyNeMoTarredIterator,
@@ -49,15 +51,17 @@ def read_cutset_from_config(config: DictConfig | dict) -> Tuple[CutSet, bool]:
     if not isinstance(config, DictConfig):
         config = DictConfig(config)
     if config.get("input_cfg") is not None:
-        return read_dataset_config(config)
-    # Now, we'll figure out if we should read Lhotse manifest or NeMo manifest.
-    use_nemo_manifest = all(config.get(opt) is None for opt in ("cuts_path", "shar_path"))
-    if use_nemo_manifest:
+        cuts, is_tarred = read_dataset_config(config)
+    elif all(config.get(opt) is None for opt in ("cuts_path", "shar_path")):
+        # Neither Lhotse manifest nor Lhotse Shar was specified, so we'll read NeMo manifest.
         if config.get("manifest_filepath") is None:
             raise IncompleteConfigError("You must specify either: manifest_filepath, cuts_path, or shar_path")
         cuts, is_tarred = read_nemo_manifest(config)
     else:
         cuts, is_tarred = read_lhotse_manifest(config)
+    # Optionally read the data ahead in a background thread.
+    if (prefetch_buffer_size := config.get("prefetch_buffer_size", 0)) > 0:
+        cuts = CutSet(LazyPrefetchingIterator(cuts, buffer_size=prefetch_buffer_size))
     return cuts, is_tarred
 
 
@@ -184,6 +188,7 @@ def read_dataset_config(config) -> tuple[CutSet, bool]:
     propagate_attrs = {
         "shuffle": config.get("shuffle", False),
         "shard_seed": config.get("shard_seed", "trng"),
+        "shar_split_for_dataloading": config.get("shar_split_for_dataloading", False),
         "text_field": config.get("text_field", "text"),
         "lang_field": config.get("lang_field", "lang"),
         "metadata_only": config.get("metadata_only", False),
@@ -191,6 +196,8 @@ def read_dataset_config(config) -> tuple[CutSet, bool]:
         "max_open_streams": config.get("max_open_streams", None),
         "token_equivalent_duration": config.get("token_equivalent_duration", None),
         "skip_missing_manifest_entries": config.get("skip_missing_manifest_entries", False),
+        "use_arrow_manifest_cache": config.get("use_arrow_manifest_cache", False),
+        "manifest_io_backend": config.get("manifest_io_backend", "stdio"),
     }
     input_cfg = config.input_cfg
     if isinstance(input_cfg, (str, Path)):
@@ -340,7 +347,11 @@ def parse_and_combine_datasets(
 
 @data_type_parser(["lhotse", "lhotse_shar"])
 def read_lhotse_manifest(config) -> tuple[CutSet, bool]:
-    is_tarred = config.get("shar_path") is not None
+    # Read every option we need exactly once: OmegaConf attribute access goes through
+    # its node/resolver machinery, which is comparatively slow and runs in every DDP rank.
+    shar_path = _to_container(config.get("shar_path"))
+    cuts_path = config.get("cuts_path")
+    is_tarred = shar_path is not None
     if is_tarred:
         # Lhotse Shar is the equivalent of NeMo's native "tarred" dataset.
         # The combination of shuffle_shards, and repeat causes this to
@@ -356,33 +367,39 @@ def read_lhotse_manifest(config) -> tuple[CutSet, bool]:
         #   to observe different data examples than in the previous run.
         # - integer means we'll set a specific seed in every worker, and data would be duplicated across them.
         #   This is mostly useful for unit testing or debugging.
+        # When ``config.shar_split_for_dataloading`` is enabled (requires an integer ``shard_seed``),
+        # every rank and dataloading worker shuffles the shards identically with seed ``shard_seed + epoch``
+        # (the epoch is incremented after each full pass) and then reads only its own disjoint subset of shards.
+        # Compared to per-worker shuffling, workers don't duplicate data and each epoch
+        # re-assigns the shards to workers.
         shard_seed = config.shard_seed
         metadata_only = config.metadata_only
         force_finite = config.force_finite
-        if config.get("cuts_path") is not None:
+        max_open_streams = config.max_open_streams
+        shar_kwargs = dict(
+            shuffle_shards=True,
+            seed=shard_seed,
+            split_for_dataloading=config.get("shar_split_for_dataloading", False),
+        )
+        if cuts_path is not None:
             warnings.warn("Note: lhotse.cuts_path will be ignored because lhotse.shar_path was provided.")
-        if isinstance(config.shar_path, (str, Path)):
-            logging.info(f"Initializing Lhotse Shar CutSet (tarred) from a single data source: '{config.shar_path}'")
-            cuts = CutSet.from_shar(
-                **_resolve_shar_inputs(config.shar_path, metadata_only), shuffle_shards=True, seed=shard_seed
-            )
+        if isinstance(shar_path, (str, Path)):
+            logging.info(f"Initializing Lhotse Shar CutSet (tarred) from a single data source: '{shar_path}'")
+            cuts = CutSet.from_shar(**_resolve_shar_inputs(shar_path, metadata_only), **shar_kwargs)
             if not metadata_only and not force_finite:
                 cuts = cuts.repeat()
-        elif isinstance(config.shar_path, Sequence):
+        elif isinstance(shar_path, Sequence):
             # Multiple datasets in Lhotse Shar format: we will dynamically multiplex them
             # with probability approximately proportional to their size
-            logging.info(
-                "Initializing Lhotse Shar CutSet (tarred) from multiple data sources with a weighted multiplexer. "
-                "We found the following sources and weights: "
-            )
             cutsets = []
             weights = []
-            for item in config.shar_path:
+            paths = []
+            for item in shar_path:
                 if isinstance(item, (str, Path)):
                     path = item
-                    cs = CutSet.from_shar(
-                        **_resolve_shar_inputs(path, metadata_only), shuffle_shards=True, seed=shard_seed
-                    )
+                    cs = CutSet.from_shar(**_resolve_shar_inputs(path, metadata_only), **shar_kwargs)
+                    # Note: len() of a lazy Shar CutSet counts newlines in the JSONL cut index files
+                    #       in byte chunks; it doesn't decode JSON or open any tar files.
                     weight = len(cs)
                 else:
                     assert isinstance(item, Sequence) and len(item) == 2 and isinstance(item[1], (int, float)), (
@@ -392,43 +409,48 @@ def read_lhotse_manifest(config) -> tuple[CutSet, bool]:
                         f"We got: '{item}'"
                     )
                     path, weight = item
-                    cs = CutSet.from_shar(
-                        **_resolve_shar_inputs(path, metadata_only), shuffle_shards=True, seed=shard_seed
-                    )
-                logging.info(f"- {path=} {weight=}")
+                    cs = CutSet.from_shar(**_resolve_shar_inputs(path, metadata_only), **shar_kwargs)
                 cutsets.append(cs)
                 weights.append(weight)
+                paths.append(path)
+            _log_weighted_sources("Lhotse Shar CutSet (tarred)", zip(paths, weights))
             cuts = mux(
                 *cutsets,
                 weights=weights,
-                max_open_streams=config.max_open_streams,
-                seed=config.shard_seed,
+                max_open_streams=max_open_streams,
+                seed=shard_seed,
                 force_finite=force_finite,
             )
-        elif isinstance(config.shar_path, Mapping):
-            fields = {k: expand_sharded_filepaths(v) for k, v in config.shar_path.items()}
-            assert "cuts" in config.shar_path.keys(), (
+        elif isinstance(shar_path, Mapping):
+            fields = {k: expand_sharded_filepaths(v) for k, v in shar_path.items()}
+            assert "cuts" in shar_path.keys(), (
                 f"Invalid value for key 'shar_path': a dict was provided, but didn't specify key 'cuts' pointing "
-                f"to the manifests. We got the following: {config.shar_path=}"
+                f"to the manifests. We got the following: {shar_path=}"
             )
             if metadata_only:
                 fields = {"cuts": fields["cuts"]}
-            cuts = CutSet.from_shar(fields=fields, shuffle_shards=True, seed=shard_seed)
+            cuts = CutSet.from_shar(fields=fields, **shar_kwargs)
             if not metadata_only and not force_finite:
                 cuts = cuts.repeat()
         else:
             raise RuntimeError(
                 f"Unexpected value for key 'shar_path'. We support string, list of strings, "
                 f"list of tuples[string,float], and dict[string,list[string]], "
-                f"but got: {type(config.shar_path)=} {config.shar_path=}"
+                f"but got: {type(shar_path)=} {shar_path=}"
             )
     else:
         # Regular Lhotse manifest points to individual audio files (like native NeMo manifest).
-        path = config.cuts_path
-        cuts = CutSet.from_file(path).map(partial(resolve_relative_paths, manifest_path=path))
+        cuts = CutSet.from_file(cuts_path).map(partial(resolve_relative_paths, manifest_path=cuts_path))
     return cuts, is_tarred
 
 
+def _to_container(value):
+    """Convert OmegaConf containers to plain Python lists/dicts (with interpolations resolved)."""
+    if isinstance(value, (DictConfig, ListConfig)):
+        return OmegaConf.to_container(value, resolve=True)
+    return value
+
+
 def _resolve_shar_inputs(path: str | Path, only_metadata: bool) -> dict:
     if only_metadata:
         return dict(fields={"cuts": sorted(Path(path).glob("cuts.*"))})
@@ -484,13 +506,29 @@ def resolve_relative_paths(cut: Cut, manifest_path: str) -> Cut:
     return cut
 
 
+def _log_weighted_sources(description: str, sources: Iterable[tuple]) -> None:
+    # A single message for all sources: configs may list hundreds of them, and every rank logs this at startup.
+    if logging.getLogger().isEnabledFor(logging.INFO):
+        lines = [f"- path={path!r} weight={weight!r}" for path, weight in sources]
+        logging.info(
+            f"Initializing {description} from {len(lines)} data sources with a weighted multiplexer. "
+            f"We found the following sources and weights:\n" + "\n".join(lines)
+        )
+
+
 @data_type_parser(["nemo", "nemo_tarred"])
 def read_nemo_manifest(config) -> tuple[CutSet, bool]:
+    # Read every option we need exactly once (see the note in ``read_lhotse_manifest``).
+    manifest_filepath = _to_container(config.manifest_filepath)
+    tarred_audio_filepaths = _to_container(config.get("tarred_audio_filepaths"))
+    skip_missing_manifest_entries = config.skip_missing_manifest_entries
+    max_open_streams = config.max_open_streams
+    shard_seed = config.shard_seed
     common_kwargs = {
         "text_field": config.text_field,
         "lang_field": config.lang_field,
         "shuffle_shards": config.shuffle,
-        "shard_seed": config.shard_seed,
+        "shard_seed": shard_seed,
         "extra_fields": config.get("extra_fields", None),
     }
     # The option below is to allow a special case of NeMo manifest iteration as Lhotse CutSet
@@ -499,25 +537,29 @@ def read_nemo_manifest(config) -> tuple[CutSet, bool]:
     # (this only has an impact on non-tarred data; tarred data is read into memory anyway).
     # This is useful for utility scripts that iterate metadata and estimate optimal batching settings
     # and other data statistics.
-    notar_kwargs = {"metadata_only": config.metadata_only}
     metadata_only = config.metadata_only
+    notar_kwargs = {
+        "metadata_only": metadata_only,
+        "use_arrow_cache": config.get("use_arrow_manifest_cache", False),
+        "io_backend": config.get("manifest_io_backend", "stdio"),
+    }
     force_finite = config.force_finite
-    is_tarred = config.get("tarred_audio_filepaths") is not None
-    if isinstance(config.manifest_filepath, (str, Path)):
-        logging.info(f"Initializing Lhotse CutSet from a single NeMo manifest (tarred): '{config.manifest_filepath}'")
+    is_tarred = tarred_audio_filepaths is not None
+    if isinstance(manifest_filepath, (str, Path)):
+        logging.info(f"Initializing Lhotse CutSet from a single NeMo manifest (tarred): '{manifest_filepath}'")
         if is_tarred and not metadata_only:
             cuts = CutSet(
                 LazyNeMoTarredIterator(
-                    config.manifest_filepath,
-                    tar_paths=config.tarred_audio_filepaths,
-                    skip_missing_manifest_entries=config.skip_missing_manifest_entries,
+                    manifest_filepath,
+                    tar_paths=tarred_audio_filepaths,
+                    skip_missing_manifest_entries=skip_missing_manifest_entries,
                     **common_kwargs,
                 )
             )
             if not force_finite:
                 cuts = cuts.repeat()
         else:
-            cuts = CutSet(LazyNeMoIterator(config.manifest_filepath, **notar_kwargs, **common_kwargs))
+            cuts = CutSet(LazyNeMoIterator(manifest_filepath, **notar_kwargs, **common_kwargs))
     else:
         # Format option 1:
         #   Assume it's [[path1], [path2], ...] (same for tarred_audio_filepaths).
@@ -532,15 +574,10 @@ def read_nemo_manifest(config) -> tuple[CutSet, bool]:
         # Format option 3:
         #   i.e., NeMo concatenated dataset
         #   Assume it's [path1, path2, ...] (while tarred_audio_filepaths in the same format).
-        logging.info(
-            f"Initializing Lhotse CutSet from multiple tarred NeMo manifest sources with a weighted multiplexer. "
-            f"We found the following sources and weights: "
-        )
-        cutsets = []
-        weights = []
-        tar_paths = config.tarred_audio_filepaths if is_tarred else repeat((None,))
-        # Create a stream for each dataset.
-        for manifest_info, tar_path in zip(config.manifest_filepath, tar_paths):
+        tar_paths = tarred_audio_filepaths if is_tarred else repeat((None,))
+
+        def open_source(source: tuple) -> tuple:
+            manifest_info, tar_path = source
             if isinstance(tar_path, (list, tuple, ListConfig)):
                 # if it's in option 1 or 2
                 (tar_path,) = tar_path
@@ -552,13 +589,15 @@ def read_nemo_manifest(config) -> tuple[CutSet, bool]:
                 nemo_iter = LazyNeMoTarredIterator(
                     manifest_path=manifest_path,
                     tar_paths=tar_path,
-                    skip_missing_manifest_entries=config.skip_missing_manifest_entries,
+                    skip_missing_manifest_entries=skip_missing_manifest_entries,
                     **common_kwargs,
                 )
             else:
                 nemo_iter = LazyNeMoIterator(manifest_path, **notar_kwargs, **common_kwargs)
             # Then, determine the weight or use one provided
             if isinstance(manifest_info, str) or len(manifest_info) == 1:
+                # Note: len() counts newlines in the JSONL manifest(s) in byte chunks without decoding JSON
+                #       (and is free for non-sharded tarred manifests, which were already read in __init__).
                 weight = len(nemo_iter)
             else:
                 assert (
@@ -572,12 +611,26 @@ def read_nemo_manifest(config) -> tuple[CutSet, bool]:
                     f"We got: '{manifest_info}'"
                 )
                 weight = manifest_info[1]
-            logging.info(f"- {manifest_path=} {weight=}")
+            return manifest_path, nemo_iter, weight
+
+        # Create a stream for each dataset.
+        # Opening a source may require reading its manifest (non-sharded tarred manifests are grouped
+        # by shard ID, and the default weight counts the lines), so we open all sources concurrently.
+        sources = list(zip(manifest_filepath, tar_paths))
+        with ThreadPoolExecutor(max_workers=max(1, min(32, len(sources)))) as executor:
+            opened_sources = list(executor.map(open_source, sources))
+        cutsets = []
+        weights = []
+        _log_weighted_sources(
+            "Lhotse CutSet from NeMo manifests",
+            ((manifest_path, weight) for manifest_path, _, weight in opened_sources),
+        )
+        for manifest_path, nemo_iter, weight in opened_sources:
             # [optional] When we have a limit on the number of open streams,
             #   split the manifest to individual shards if applicable.
             #   This helps the multiplexing achieve closer data distribution
             #   to the one desired in spite of the limit.
-            if config.max_open_streams is not None:
+            if max_open_streams is not None:
                 for subiter in nemo_iter.to_shards():
                     cutsets.append(CutSet(subiter))
                     weights.append(weight)
@@ -588,8 +641,8 @@ def read_nemo_manifest(config) -> tuple[CutSet, bool]:
         cuts = mux(
             *cutsets,
             weights=weights,
-            max_open_streams=config.max_open_streams,
-            seed=config.shard_seed,
+            max_open_streams=max_open_streams,
+            seed=shard_seed,
             force_finite=force_finite or metadata_only,
         )
     return cuts, is_tarred
@@ -78,6 +78,11 @@ class LhotseDataLoadingConfig:
     shar_path: Any = None  # str | list[str | tuple[str, float | int]] | None = None
     #  Enable this to support dataloading from JSON manifests that reference subsets of audio tar files.
     skip_missing_manifest_entries: bool = False
+    #  Enable this to cache non-tarred NeMo manifests as memory-mapped Arrow files (<manifest>.arrow); needs pyarrow.
+    use_arrow_manifest_cache: bool = False
+    #  Set to "readahead" to read non-tarred NeMo manifests with large chunks kept in flight by a background thread
+    #  (helps on NFS / cold page cache). The default "stdio" uses Python's buffered line reader.
+    manifest_io_backend: str = "stdio"
     tarred_random_access: bool = False  # deprecated, replaced by: skip_missing_manifest_entries
     # 2. Batch size.
     #   a. Existing NeMo options.
@@ -98,7 +103,9 @@ class LhotseDataLoadingConfig:
     shuffle_buffer_size: int | None = 10000
     drop_last: bool = False
     shard_seed: int | str = "trng"
+    shar_split_for_dataloading: bool = False  # Lhotse Shar only: split shards across ranks/workers (int shard_seed)
     max_open_streams: int | None = None
+    prefetch_buffer_size: int = 0  # when > 0, read this many cuts ahead in a background thread
     cuda_expandable_segments: bool = True
     # e. Multi-config related options.
     #    Setting multi_config=True will scan the config for keys with DictConfig values,
@@ -0,0 +1,85 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from queue import Full, Queue
+from typing import Iterable
+
+from lhotse.lazy import LazyIteratorChain
+
+
+class LazyPrefetchingIterator:
+    """
+    ``LazyPrefetchingIterator`` iterates the wrapped ``source`` in a background thread and keeps
+    up to ``buffer_size`` items ready for the consumer. This overlaps manifest parsing and tar reads
+    with the rest of the dataloading pipeline (sampling, collation, audio decoding).
+
+    The thread is only started when the iteration begins, so this object can be pickled and
+    sent to dataloading worker processes. Exceptions raised by ``source`` are re-raised to the consumer.
+
+    Example::
+
+        >>> cuts = CutSet(LazyPrefetchingIterator(CutSet.from_shar(in_dir="data/shar"), buffer_size=100))
+    """
+
+    def __init__(self, source: Iterable, buffer_size: int) -> None:
+        assert buffer_size > 0, f"buffer_size must be a positive integer (got: {buffer_size})"
+        self.source = source
+        self.buffer_size = buffer_size
+
+    def __iter__(self):
+        queue = Queue(maxsize=self.buffer_size)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            # Use a timeout so that the thread can exit when the consumer stopped early.
+            while not stop.is_set():
+                try:
+                    queue.put(item, timeout=0.1)
+                    return True
+                except Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for item in self.source:
+                    if not put(item):
+                        return
+                put(_PREFETCH_END)
+            except BaseException as e:
+                put(_PrefetchError(e))
+
+        threading.Thread(target=produce, daemon=True).start()
+        try:
+            while (item := queue.get()) is not _PREFETCH_END:
+                if isinstance(item, _PrefetchError):
+                    raise item.exception
+                yield item
+        finally:
+            stop.set()
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def __add__(self, other):
+        return LazyIteratorChain(self, other)
+
+
+_PREFETCH_END = object()
+
+
+class _PrefetchError:
+    def __init__(self, exception: BaseException) -> None:
+        self.exception = exception
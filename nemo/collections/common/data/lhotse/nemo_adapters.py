@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import logging
+import os
 import random
 import re
 import tarfile
@@ -22,17 +23,25 @@ from typing import Generator, Iterable, List, Literal
 
 import lhotse.serialization
 import soundfile
-from cytoolz import groupby
+from cytoolz import groupby, partition_all
 from lhotse import AudioSource, MonoCut, Recording, SupervisionSegment
 from lhotse.audio.backend import LibsndfileBackend
 from lhotse.cut import Cut
 from lhotse.dataset.dataloading import resolve_seed
-from lhotse.lazy import LazyIteratorChain, LazyJsonlIterator
-from lhotse.serialization import open_best
+from lhotse.lazy import LazyIteratorChain, LazyJsonlIterator, count_newlines_fast
+from lhotse.serialization import decode_json_line, open_best
 from lhotse.utils import compute_num_samples, ifnone
 
+from nemo.collections.common.data.lhotse.iterators import LazyPrefetchingIterator
 from nemo.collections.common.parts.preprocessing.manifest import get_full_path
 
+try:
+    import pyarrow as pa
+
+    HAVE_PYARROW = True
+except (ImportError, ModuleNotFoundError):
+    HAVE_PYARROW = False
+
 
 class LazyNeMoIterator:
     """
@@ -75,6 +84,15 @@ class LazyNeMoIterator:
         ...     "nemo_manifests/train.json",
         ...     extra_fields=[{"type": "text_sample", "name": "question", "path": "questions.txt"}],
         ... ))
+
+    Setting ``use_arrow_cache=True`` converts each local manifest file to an Arrow IPC file
+    on first use (stored next to it as ``<manifest>.arrow``), which is then memory-mapped instead of parsing
+    the JSON lines on every pass. It requires ``pyarrow``; we fall back to reading JSON lines when it's not
+    available or the conversion fails. See :class:`LazyArrowJsonlIterator` for details.
+
+    Setting ``io_backend="readahead"`` reads local manifest files with :class:`LazyReadaheadJsonlIterator`,
+    which keeps large sequential reads in flight in a background thread. It helps on high-latency storage
+    such as NFS or a cold page cache. The default ``"stdio"`` uses Python's buffered line reader.
     """
 
     def __init__(
@@ -86,16 +104,21 @@ class LazyNeMoIterator:
         shuffle_shards: bool = False,
         shard_seed: int | Literal["randomized", "trng"] = "trng",
         extra_fields: list[dict[str, str]] | None = None,
+        use_arrow_cache: bool = False,
+        io_backend: Literal["stdio", "readahead"] = "stdio",
     ) -> None:
+        assert io_backend in ("stdio", "readahead"), f"Unsupported manifest {io_backend=}"
         self.path = path
         self.shuffle_shards = shuffle_shards
         self.shard_seed = shard_seed
         paths = expand_sharded_filepaths(path)
         if len(paths) == 1:
-            self.source = LazyJsonlIterator(paths[0])
+            self.source = _open_jsonl_manifest(paths[0], use_arrow_cache=use_arrow_cache, io_backend=io_backend)
         else:
             self.source = LazyIteratorChain(
-                *(LazyJsonlIterator(p) for p in paths), shuffle_iters=self.shuffle_shards, seed=self.shard_seed
+                *(_open_jsonl_manifest(p, use_arrow_cache=use_arrow_cache, io_backend=io_backend) for p in paths),
+                shuffle_iters=self.shuffle_shards,
+                seed=self.shard_seed,
             )
         self.text_field = text_field
         self.lang_field = lang_field
@@ -193,6 +216,211 @@ class LazyNeMoIterator:
             return Recording.from_file(audio_path)
 
 
+class LazyArrowJsonlIterator:
+    """
+    ``LazyArrowJsonlIterator`` is a drop-in replacement for Lhotse's ``LazyJsonlIterator``
+    that reads the JSON lines from an Arrow IPC file cached next to the manifest (see :func:`_arrow_cached_manifest`).
+    The Arrow file is memory-mapped, so we avoid calling ``json.loads`` for each line and only
+    the pages that are actually read are loaded into memory.
+    It yields the same dicts as ``LazyJsonlIterator``: keys set to ``null`` are kept, and keys that are missing
+    in a given line are omitted again.
+
+    Example::
+
+        >>> for item in LazyArrowJsonlIterator("nemo_manifests/train.json"):
+        ...     print(item["audio_filepath"], item["duration"])
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        assert HAVE_PYARROW, "LazyArrowJsonlIterator requires pyarrow to be installed (pip install pyarrow)."
+        self.path = path
+
+    def _open(self) -> "pa.ipc.RecordBatchFileReader | None":
+        arrow_path = _try_arrow_cached_manifest(self.path)
+        if arrow_path is None:
+            return None
+        return pa.ipc.open_file(pa.memory_map(str(arrow_path), "r"))
+
+    def __iter__(self) -> Generator[dict, None, None]:
+        reader = self._open()
+        if reader is None:
+            yield from LazyJsonlIterator(self.path)
+            return
+        for batch_idx in range(reader.num_record_batches):
+            for item in reader.get_batch(batch_idx).to_pylist():
+                for key in item.pop(_ARROW_MISSING_KEYS) or ():
+                    del item[key]
+                yield item
+
+    def __len__(self) -> int:
+        reader = self._open()
+        if reader is None:
+            return len(LazyJsonlIterator(self.path))
+        return sum(reader.get_batch(batch_idx).num_rows for batch_idx in range(reader.num_record_batches))
+
+    def __add__(self, other):
+        return LazyIteratorChain(self, other)
+
+
+# Column of the Arrow manifest cache with the keys that are missing in a line (null if there are none).
+_ARROW_MISSING_KEYS = "__missing_keys__"
+
+
+def _arrow_source_metadata(path: Path) -> dict[bytes, bytes]:
+    # Identifies the manifest version the cache was created from (also when it's replaced by an older file).
+    stat = path.stat()
+    return {b"source_size": str(stat.st_size).encode(), b"source_mtime_ns": str(stat.st_mtime_ns).encode()}
+
+
+def _is_arrow_cache_valid(arrow_path: Path, path: Path) -> bool:
+    if not arrow_path.is_file():
+        return False
+    try:
+        metadata = pa.ipc.open_file(pa.memory_map(str(arrow_path), "r")).schema.metadata or {}
+    except pa.ArrowInvalid:
+        return False
+    return all(metadata.get(key) == value for key, value in _arrow_source_metadata(path).items())
+
+
+def _arrow_cached_manifest(path: str | Path, batch_size: int = 10000) -> Path:
+    """
+    Returns the path to an Arrow IPC file with the contents of JSONL manifest ``path``.
+    The file is stored as ``<path>.arrow``; it is (re-)created when missing, or when the size or modification time
+    of the manifest differ from those stored in its schema metadata.
+    The manifest is converted in record batches of ``batch_size`` lines, so it's never fully loaded into memory.
+    The first batch determines the schema: if a later line has a new key, or a value of a different type,
+    we raise an exception and the caller reads the JSON lines instead.
+    """
+    path = Path(path)
+    arrow_path = path.with_name(f"{path.name}.arrow")
+    if _is_arrow_cache_valid(arrow_path, path):
+        return arrow_path
+    source_metadata = _arrow_source_metadata(path)
+    # Write to a temporary file first so that concurrent readers (e.g. other DDP ranks) never see a partial file.
+    tmp_path = arrow_path.with_name(f"{arrow_path.name}.{os.getpid()}.tmp")
+    keys, schema, writer = None, None, None
+    try:
+        with pa.OSFile(str(tmp_path), "wb") as sink:
+            for items in partition_all(batch_size, LazyJsonlIterator(path)):
+                if keys is None:
+                    keys = list(dict.fromkeys(key for item in items for key in item))
+                elif new_keys := {key for item in items for key in item}.difference(keys):
+                    raise ValueError(f"Keys {sorted(new_keys)} are not present in the first {batch_size} lines.")
+                columns = {key: [item.get(key) for item in items] for key in keys}
+                columns[_ARROW_MISSING_KEYS] = pa.array(
+                    [[key for key in keys if key not in item] or None for item in items], type=pa.list_(pa.string())
+                )
+                batch = pa.RecordBatch.from_pydict(columns, schema=schema)
+                if writer is None:
+                    schema = batch.schema
+                    writer = pa.ipc.new_file(sink, schema.with_metadata(source_metadata))
+                writer.write_batch(batch)
+            if writer is None:
+                writer = pa.ipc.new_file(sink, pa.schema([], metadata=source_metadata))
+            writer.close()
+        os.replace(tmp_path, arrow_path)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return arrow_path
+
+
+def _try_arrow_cached_manifest(path: str | Path) -> Path | None:
+    """Calls :func:`_arrow_cached_manifest`; returns None if the conversion fails, to read JSON lines instead."""
+    try:
+        return _arrow_cached_manifest(path)
+    except Exception as e:
+        logging.warning(f"Failed to create Arrow manifest cache for '{path}', reading JSON lines instead: {e}")
+        return None
+
+
+class LazyReadaheadJsonlIterator:
+    """
+    ``LazyReadaheadJsonlIterator`` is a drop-in replacement for Lhotse's ``LazyJsonlIterator`` intended for
+    local manifests on high-latency storage (e.g. NFS, or a cold page cache on a fresh node).
+    It hints the kernel that the file is read sequentially, reads it in ``chunk_size`` byte chunks, and keeps up to
+    ``queue_depth`` chunks in flight in a background thread, so that I/O latency overlaps with JSON decoding.
+
+    Example::
+
+        >>> for item in LazyReadaheadJsonlIterator("nemo_manifests/train.json"):
+        ...     print(item["audio_filepath"], item["duration"])
+    """
+
+    def __init__(self, path: str | Path, chunk_size: int = 1 << 20, queue_depth: int = 32) -> None:
+        self.path = path
+        self.chunk_size = chunk_size
+        self.queue_depth = queue_depth
+        self._len = None
+
+    def __iter__(self) -> Generator[dict, None, None]:
+        chunks = LazyPrefetchingIterator(_FileChunks(self.path, self.chunk_size), buffer_size=self.queue_depth)
+        tot = 0
+        tail = b""
+        for chunk in chunks:
+            *lines, tail = (tail + chunk).split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield decode_json_line(line)
+                    tot += 1
+        if tail.strip():
+            yield decode_json_line(tail)
+            tot += 1
+        if self._len is None:
+            self._len = tot
+
+    def __len__(self) -> int:
+        if self._len is None:
+            self._len = count_newlines_fast(self.path)
+        return self._len
+
+    def __add__(self, other):
+        return LazyIteratorChain(self, other)
+
+
+class _FileChunks:
+    """Iterates over the raw bytes of a local file in ``chunk_size`` pieces."""
+
+    def __init__(self, path: str | Path, chunk_size: int) -> None:
+        self.path = path
+        self.chunk_size = chunk_size
+
+    def __iter__(self) -> Generator[bytes, None, None]:
+        with open(self.path, "rb", buffering=0) as f:
+            if hasattr(os, "posix_fadvise"):
+                # Lets the kernel use a larger readahead window for this file.
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            while chunk := f.read(self.chunk_size):
+                yield chunk
+
+
+def _open_jsonl_manifest(
+    path: str, use_arrow_cache: bool = False, io_backend: str = "stdio"
+) -> LazyJsonlIterator | LazyArrowJsonlIterator | LazyReadaheadJsonlIterator:
+    if use_arrow_cache:
+        if not HAVE_PYARROW:
+            logging.warning("Cannot use Arrow manifest cache because pyarrow is not installed (pip install pyarrow).")
+        elif not Path(path).is_file():
+            logging.warning(f"Arrow manifest cache is only supported for local files (we got: '{path}').")
+        else:
+            if _try_arrow_cached_manifest(path) is not None:
+                return LazyArrowJsonlIterator(path)
+    if io_backend == "readahead":
+        if not Path(path).is_file():
+            logging.warning(f"Readahead manifest reader is only supported for local files (we got: '{path}').")
+        elif _is_gzip_file(path):
+            # LazyJsonlIterator decompresses it with open_best.
+            logging.warning(f"Readahead manifest reader does not support compressed files (we got: '{path}').")
+        else:
+            return LazyReadaheadJsonlIterator(path)
+    return LazyJsonlIterator(path)
+
+
+def _is_gzip_file(path: str | Path) -> bool:
+    with open(path, "rb") as f:
+        return f.read(2) == b"\x1f\x8b"
+
+
 class LazyNeMoTarredIterator:
     """
     ``LazyNeMoTarredIterator`` reads a NeMo tarred JSON manifest and converts it on the fly to an ``Iterable[Cut]``.
@@ -21,6 +21,7 @@ from lhotse.utils import ifnone
 
 from nemo.collections.common.data.prompt_fn import registered_prompt_format_fn
 from nemo.collections.common.prompts.formatter import Modality, PromptFormatter
+from nemo.collections.common.tokenizers import TokenizerSpec
 from nemo.collections.common.tokenizers.canary_tokenizer import (
     CANARY_BOS,
     CANARY_EOS,
@@ -55,12 +56,32 @@ class CanaryPromptFormatter(PromptFormatter):
         },
     }
 
+    def __init__(self, tokenizer: TokenizerSpec, defaults: list[dict] | None = None) -> None:
+        super().__init__(tokenizer, defaults=defaults)
+        # Canary user turns take only a handful of distinct values (languages x tasks x pnc),
+        # so we memoize their token IDs. The assistant turn contains the transcript and is never cached.
+        self._user_turn_cache: dict[tuple, tuple[int, ...]] = {}
+
     def _validate_slot_values(self, expected: dict[str, Modality], received: dict[str, Any]) -> None:
         if "taskname" in received and "task" not in received:
             received["task"] = received.pop("taskname")
         return super()._validate_slot_values(expected=expected, received=received)
 
     def encode_turn(self, prompt_template: str, expected_slots: dict, slot_values: dict) -> list[int]:
+        if prompt_template != self.get_template("user"):
+            return self._encode_turn(prompt_template, expected_slots, slot_values)
+        # Note: 'taskname' and prompt language affect the encoding too (see map_manifest_values_to_special_tokens).
+        key = (
+            prompt_template,
+            *(slot_values.get(k) for k in (*expected_slots, "taskname", self.PROMPT_LANGUAGE_SLOT)),
+        )
+        if (tokens := self._user_turn_cache.get(key)) is None:
+            tokens = self._user_turn_cache[key] = tuple(
+                self._encode_turn(prompt_template, expected_slots, slot_values)
+            )
+        return list(tokens)
+
+    def _encode_turn(self, prompt_template: str, expected_slots: dict, slot_values: dict) -> list[int]:
         # This method handles a level of indirection for Canary.
         # It maps values provided in trcfg to the actual special tokens
         # expected to be present in canary prompt.
@@ -73,31 +94,71 @@ class CanaryPromptFormatter(PromptFormatter):
         )
 
 
+# Maps the values of 'pnc' slot found in manifests to Canary special tokens; unknown values map to CANARY_NOPNC.
+_PNC_MAP = {
+    CANARY_PNC: CANARY_PNC,
+    CANARY_NOPNC: CANARY_NOPNC,
+    "yes": CANARY_PNC,
+    "1": CANARY_PNC,
+    "True": CANARY_PNC,
+    "true": CANARY_PNC,
+    "pnc": CANARY_PNC,
+}
+
+# Maps the values of 'task' slot found in manifests to Canary special tokens.
+_TASK_MAP = {
+    "<|transcribe|>": "<|transcribe|>",
+    "transcribe": "<|transcribe|>",
+    "asr": "<|transcribe|>",
+    "<|translate|>": "<|translate|>",
+    "translate": "<|translate|>",
+    "ast": "<|translate|>",
+    "s2t_translation": "<|translate|>",
+}
+
+
+_NORMALIZED_PNC = frozenset((CANARY_PNC, CANARY_NOPNC))
+_NORMALIZED_TASKS = frozenset(_TASK_MAP.values())
+
+
+def _is_normalized(slot: str, value: str) -> bool:
+    if slot in ("source_lang", "target_lang"):
+        return value.startswith("<|") and value.endswith("|>")
+    if slot == "pnc":
+        return value in _NORMALIZED_PNC
+    if slot in ("task", "taskname"):
+        return value in _NORMALIZED_TASKS
+    return True
+
+
 def map_manifest_values_to_special_tokens(slot_values: dict[str, str]) -> dict[str, str]:
+    # Fast path: values that are already special tokens need no remapping, so skip the copy.
+    # Note: the returned dict may be the input itself; callers must not mutate it.
+    if all(_is_normalized(k, v) for k, v in slot_values.items()):
+        return slot_values
+
     slot_values = slot_values.copy()
 
     any_special_token_present = False
 
     for k in ("source_lang", "target_lang"):
         if k in slot_values and not ((v := slot_values[k]).startswith("<|") and v.endswith("|>")):
-            slot_values[k] = "<|" + slot_values[k] + "|>"
+            slot_values[k] = "<|" + v + "|>"
             any_special_token_present = True
 
     k = "pnc"
-    if k in slot_values and slot_values[k] not in (CANARY_PNC, CANARY_NOPNC):
-        slot_values[k] = CANARY_PNC if slot_values[k] in ("yes", "1", "True", "true", "pnc") else CANARY_NOPNC
+    if k in slot_values and (v := _PNC_MAP.get(slot_values[k], CANARY_NOPNC)) != slot_values[k]:
+        slot_values[k] = v
         any_special_token_present = True
 
     # Note: we re-map 'taskname' to 'task' for compatibility with earlier versions of Canary training.
     for k in ("task", "taskname"):
-        if k in slot_values and slot_values[k] not in ("<|transcribe|>", "<|translate|>"):
-            if slot_values[k] in {"translate", "ast", "s2t_translation"}:
-                slot_values["task"] = "<|translate|>"
-            elif slot_values[k] in {"transcribe", "asr"}:
-                slot_values["task"] = "<|transcribe|>"
-            else:
-                assert False, f"Task {slot_values[k]} invalid task for slot {k}"
-            any_special_token_present = True
+        if k in slot_values:
+            v = _TASK_MAP.get(slot_values[k])
+            assert v is not None, f"Task {slot_values[k]} invalid task for slot {k}"
+            if v != slot_values[k]:
+                slot_values["task"] = v
+                any_special_token_present = True
 
     # Auto-inject which tokenizer to look up in CanaryTokenizer if not provided,
     # and slots for this turn correspond to user prompt.
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import re
 from abc import ABC
 from functools import lru_cache
 from typing import Any, Type
@@ -166,6 +167,8 @@ class PromptFormatter(ABC):
 
     # Internal reserved field.
     _REGISTERED_FORMATTERS = {}
+    # Internal field: templates pre-split into literal text and slot names, keyed by (template, slot names).
+    _TEMPLATE_PARTS = {}
 
     def __init__(self, tokenizer: TokenizerSpec, defaults: list[dict] | None = None) -> None:
         self.tokenizer = tokenizer
@@ -194,6 +197,12 @@ class PromptFormatter(ABC):
                 assert (
                     _mangled(slot) in template
                 ), f"{ERR} Slot '{slot}' not found in template '{template}' for role '{role}'"
+        cls._TEMPLATE_PARTS = {
+            (cls.get_template(role), frozenset(cls.get_slots(role))): _split_template(
+                cls.get_template(role), cls.get_slots(role)
+            )
+            for role in cls.get_roles()
+        }
         super().__init_subclass__(**kwargs)
 
     @classmethod
@@ -245,14 +254,16 @@ class PromptFormatter(ABC):
     def encode_turn(
         self, prompt_template: str, expected_slots: dict[str, Modality], slot_values: dict[str, Any]
     ) -> list[int]:
-        prompt = prompt_template
         for slot in expected_slots:
             # For the final substitution of 'slot' in the template we have to mangle it to '|slot|' anyway,
             # but 'slot' form enables to use valid python identifiers as **kwargs
             # for passing slots around in user functions.
             value = slot_values.get(slot)
             assert value is not None, f"Missing required {slot=} in {slot_values=} for {prompt_template=}"
-            prompt = prompt.replace(_mangled(slot), value)
+        # Class templates are split when the class is defined; others (e.g. user-provided) are split here.
+        if (parts := self._TEMPLATE_PARTS.get((prompt_template, frozenset(expected_slots)))) is None:
+            parts = _split_template(prompt_template, expected_slots)
+        prompt = "".join(slot_values[part] if idx % 2 else part for idx, part in enumerate(parts))
         return self._apply_tokenizer(prompt, lang=slot_values.get(self.PROMPT_LANGUAGE_SLOT))
 
     def encode_dialog(self, turns: list[dict]) -> dict[str, torch.Tensor]:
@@ -387,6 +398,18 @@ class PromptFormatter(ABC):
                     )
 
 
+def _split_template(template: str, slots) -> tuple[str, ...]:
+    """
+    Splits ``template`` on the ``|slot|`` markers of ``slots``.
+    The result alternates literal text (even positions) and slot names (odd positions).
+    """
+    if not slots:
+        return (template,)
+    markers = sorted((_mangled(slot) for slot in slots), key=len, reverse=True)
+    parts = re.split(f"({'|'.join(map(re.escape, markers))})", template)
+    return tuple(_unmangled(part) if idx % 2 else part for idx, part in enumerate(parts))
+
+
 def _mangled(slot: str) -> str:
     if not (slot[0] == "|" and slot[-1] == "|"):
         return f"|{slot}|"
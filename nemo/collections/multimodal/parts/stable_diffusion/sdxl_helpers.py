@@ -14,6 +14,7 @@
 
 import math
 import os
+from collections import OrderedDict
 from typing import List, Optional, Union
 
 import numpy as np
@@ -66,6 +67,72 @@ class Img2ImgDiscretizationWrapper:
         return sigmas
 
 
+class CUDAGraphDenoiser:
+    """
+    Wraps a denoiser ``fn(x, sigma, c)`` and replays it from captured CUDA graphs,
+    removing per-step kernel launch overhead from the sampling loop.
+    One graph is captured per input signature (shapes, dtypes, conditioning keys and autocast state) and kept
+    for reuse by later sampling calls, up to ``max_graphs`` signatures (least recently used are dropped).
+    Inputs are copied into static buffers before every replay.
+    ``fn`` must only depend on its inputs and on module parameters that are updated in place (as EMA scopes do).
+    """
+
+    def __init__(self, denoiser, num_warmup_steps: int = 1, max_graphs: int = 4):
+        self.denoiser = denoiser
+        self.num_warmup_steps = num_warmup_steps
+        self.max_graphs = max_graphs
+        # signature -> (graph, static inputs, static output)
+        self._graphs = OrderedDict()
+
+    def __call__(self, x, sigma, c):
+        if not all(isinstance(v, torch.Tensor) for v in c.values()):
+            return self.denoiser(x, sigma, c)
+        signature = (
+            x.shape,
+            x.dtype,
+            sigma.shape,
+            sigma.dtype,
+            tuple((k, v.shape, v.dtype) for k, v in sorted(c.items())),
+            torch.is_autocast_enabled(),
+            torch.get_autocast_gpu_dtype(),
+        )
+        if signature in self._graphs:
+            self._graphs.move_to_end(signature)
+        else:
+            while self._graphs and len(self._graphs) >= self.max_graphs:
+                self._graphs.popitem(last=False)
+            self._graphs[signature] = self._capture(x, sigma, c)
+        graph, (static_x, static_sigma, static_c), static_output = self._graphs[signature]
+        static_x.copy_(x)
+        static_sigma.copy_(sigma)
+        for k, v in static_c.items():
+            v.copy_(c[k])
+        graph.replay()
+        # The static output is overwritten by the next replay; samplers such as DPM++ 2M keep it around.
+        return static_output.clone()
+
+    def _capture(self, x, sigma, c):
+        static_x, static_sigma = x.clone(), sigma.clone()
+        static_c = {k: v.clone() for k, v in c.items()}
+        # Without the autocast weight cache, the casts are part of the graph. Otherwise the graph would read
+        # cached fp16 copies of the weights, which are freed when the caller's autocast context exits.
+        no_cache_autocast = torch.autocast(
+            "cuda", dtype=torch.get_autocast_gpu_dtype(), enabled=torch.is_autocast_enabled(), cache_enabled=False
+        )
+        with no_cache_autocast:
+            # Warm up on a side stream so that lazy initialization (cuBLAS handles, autotuning) is not captured.
+            stream = torch.cuda.Stream()
+            stream.wait_stream(torch.cuda.current_stream())
+            with torch.cuda.stream(stream):
+                for _ in range(self.num_warmup_steps):
+                    self.denoiser(static_x, static_sigma, static_c)
+            torch.cuda.current_stream().wait_stream(stream)
+            graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(graph):
+                static_output = self.denoiser(static_x, static_sigma, static_c)
+        return graph, (static_x, static_sigma, static_c), static_output
+
+
 def do_sample(
     model,
     sampler,
@@ -81,6 +148,7 @@ def do_sample(
     filter=None,
     seed=42,
     device="cuda",
+    graph_denoiser: Optional[CUDAGraphDenoiser] = None,
 ):
     if force_uc_zero_embeddings is None:
         force_uc_zero_embeddings = []
@@ -121,6 +189,9 @@ def do_sample(
                 def denoiser(input, sigma, c):
                     return model.denoiser(model.model, input, sigma, c, **additional_model_inputs)
 
+                if graph_denoiser is not None and not additional_model_inputs:
+                    denoiser = graph_denoiser
+
                 samples_z = sampler(denoiser, randn, cond=c, uc=uc)
                 samples_x = model.decode_first_stage(samples_z)
                 samples = torch.clamp((samples_x + 1.0) / 2.0, min=0.0, max=1.0)
@@ -198,6 +269,7 @@ def do_img2img(
     filter=None,
     seed=42,
     device="cuda",
+    graph_denoiser: Optional[CUDAGraphDenoiser] = None,
 ):
     rng = torch.Generator(device=device).manual_seed(seed)
 
@@ -234,6 +306,9 @@ def do_img2img(
                 def denoiser(x, sigma, c):
                     return model.denoiser(model.model, x, sigma, c)
 
+                if graph_denoiser is not None:
+                    denoiser = graph_denoiser
+
                 samples_z = sampler(denoiser, noised_z, cond=c, uc=uc)
                 samples_x = model.decode_first_stage(samples_z)
                 samples = torch.clamp((samples_x + 1.0) / 2.0, min=0.0, max=1.0)
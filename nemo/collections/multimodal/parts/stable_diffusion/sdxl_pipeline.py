@@ -12,8 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from contextlib import contextmanager
 from typing import Optional
 
+import torch
 from omegaconf import OmegaConf
 
 from nemo.collections.multimodal.modules.stable_diffusion.diffusionmodules.sampling import (
@@ -25,6 +27,7 @@ from nemo.collections.multimodal.modules.stable_diffusion.diffusionmodules.sampl
     LinearMultistepSampler,
 )
 from nemo.collections.multimodal.parts.stable_diffusion.sdxl_helpers import (
+    CUDAGraphDenoiser,
     Img2ImgDiscretizationWrapper,
     do_img2img,
     do_sample,
@@ -32,15 +35,77 @@ from nemo.collections.multimodal.parts.stable_diffusion.sdxl_helpers import (
 
 
 class SamplingPipeline:
-    def __init__(self, model, device="cuda", use_fp16=True, is_legacy=False) -> None:
+    def __init__(
+        self,
+        model,
+        device="cuda",
+        use_fp16=True,
+        is_legacy=False,
+        channels_last=False,
+        compile_unet=False,
+        use_cuda_graph=False,
+    ) -> None:
         self.device = device
         self.model = model
+        self.use_fp16 = use_fp16
         if use_fp16:
-            model.conditioner.half()
-            model.model.half()
+            self.model.conditioner.half()
+            self.model.model.half()
+        self.channels_last = channels_last
+        if channels_last:
+            # Opt-in: NHWC lets cuDNN pick faster fp16 convolution kernels on tensor-core GPUs, but is slower on CPU.
+            self.model.model = self.model.model.to(memory_format=torch.channels_last)
         self.vae_scale_factor = 2 ** (self.model.first_stage_model.encoder.num_resolutions - 1)
         self.is_legacy = is_legacy
+        self.compile_unet = compile_unet
+        self._compiled_forward = None
+        self.use_cuda_graph = use_cuda_graph
+        # Shared by all sampling calls, so graphs captured for a given shape are replayed by later calls too.
+        self._graph_denoiser = None
+        if use_cuda_graph:
+            self._graph_denoiser = CUDAGraphDenoiser(
+                lambda x, sigma, c: self.model.denoiser(self.model.model, x, sigma, c)
+            )
+
+    @classmethod
+    def from_shared(cls, base: "SamplingPipeline", model, **kwargs) -> "SamplingPipeline":
+        """
+        Creates a pipeline for ``model`` (e.g. the SDXL refiner) that reuses the first stage model (VAE)
+        and conditioner of ``base`` whenever they are the same module or hold the same tensors
+        (e.g. ``model`` was built from ``base``'s state dict with ``load_state_dict(..., assign=True)``),
+        so that they are kept and cast to fp16 once. Weight values are not compared.
+        The new pipeline uses the device and fp16 setting of ``base``, since shared modules cannot differ in those.
+        """
+        for name in ("first_stage_model", "conditioner"):
+            shared = getattr(base.model, name)
+            if _have_same_weights(shared, getattr(model, name)):
+                setattr(model, name, shared)
+        return cls(model, device=base.device, use_fp16=base.use_fp16, **kwargs)
 
+    @contextmanager
+    def _compiled_unet(self):
+        """
+        When ``compile_unet`` is set, routes UNet calls through a ``torch.compile``-d forward for the duration
+        of the context. The forward is compiled once with ``dynamic=False``: dynamo keeps one graph per input shape
+        (height, width, batch size) in the cache of the ``forward`` code object and recompiles for each new shape,
+        up to ``torch._dynamo.config.cache_size_limit`` shapes, after which it falls back to eager mode.
+        Only ``forward`` is patched, so parameter names seen by EMA / checkpointing are unchanged.
+        """
+        if not self.compile_unet:
+            yield
+            return
+        unet = self.model.model
+        if self._compiled_forward is None:
+            # Inductor's own CUDA graphs cannot be nested inside the sampler-level graph capture.
+            mode = "max-autotune-no-cudagraphs" if self.use_cuda_graph else "max-autotune"
+            self._compiled_forward = torch.compile(unet.forward, mode=mode, fullgraph=False, dynamic=False)
+        unet.forward = self._compiled_forward
+        try:
+            yield
+        finally:
+            del unet.forward
+
+    @torch.inference_mode()
     def text_to_image(
         self,
         params,
@@ -51,26 +116,31 @@ class SamplingPipeline:
         seed: int = 42,
     ):
         sampler = get_sampler_config(params)
-        value_dict = OmegaConf.to_container(params, resolve=True)
-        value_dict["prompt"] = prompt
-        value_dict["negative_prompt"] = negative_prompt
-        value_dict["target_width"] = params.width
-        value_dict["target_height"] = params.height
-        return do_sample(
-            self.model,
-            sampler,
-            value_dict,
-            samples,
-            params.height,
-            params.width,
-            self.model.model.diffusion_model.in_channels,
-            self.vae_scale_factor,
-            force_uc_zero_embeddings=["txt", "captions"] if not self.is_legacy else [],
-            return_latents=return_latents,
-            filter=None,
-            seed=seed,
-        )
+        value_dict = {
+            **OmegaConf.to_container(params, resolve=True),
+            "prompt": prompt,
+            "negative_prompt": negative_prompt,
+            "target_width": params.width,
+            "target_height": params.height,
+        }
+        with self._compiled_unet():
+            return do_sample(
+                self.model,
+                sampler,
+                value_dict,
+                samples,
+                params.height,
+                params.width,
+                self.model.model.diffusion_model.in_channels,
+                self.vae_scale_factor,
+                force_uc_zero_embeddings=["txt", "captions"] if not self.is_legacy else [],
+                return_latents=return_latents,
+                filter=None,
+                seed=seed,
+                graph_denoiser=self._graph_denoiser,
+            )
 
+    @torch.inference_mode()
     def image_to_image(
         self,
         params,
@@ -88,23 +158,30 @@ class SamplingPipeline:
                 sampler.discretization, strength=params.img2img_strength,
             )
         height, width = image.shape[2], image.shape[3]
-        value_dict = OmegaConf.to_container(params, resolve=True)
-        value_dict["prompt"] = prompt
-        value_dict["negative_prompt"] = negative_prompt
-        value_dict["target_width"] = width
-        value_dict["target_height"] = height
-        return do_img2img(
-            image,
-            self.model,
-            sampler,
-            value_dict,
-            samples,
-            force_uc_zero_embeddings=["txt", "captions"] if not self.model.is_legacy else [],
-            return_latents=return_latents,
-            filter=None,
-            seed=seed,
-        )
+        value_dict = {
+            **OmegaConf.to_container(params, resolve=True),
+            "prompt": prompt,
+            "negative_prompt": negative_prompt,
+            "target_width": width,
+            "target_height": height,
+        }
+        if self.channels_last:
+            image = image.contiguous(memory_format=torch.channels_last)
+        with self._compiled_unet():
+            return do_img2img(
+                image,
+                self.model,
+                sampler,
+                value_dict,
+                samples,
+                force_uc_zero_embeddings=["txt", "captions"] if not self.is_legacy else [],
+                return_latents=return_latents,
+                filter=None,
+                seed=seed,
+                graph_denoiser=self._graph_denoiser,
+            )
 
+    @torch.inference_mode()
     def refiner(
         self,
         params,
@@ -133,17 +210,32 @@ class SamplingPipeline:
             "negative_aesthetic_score": params.negative_aesthetic_score,
         }
 
-        return do_img2img(
-            image,
-            self.model,
-            sampler,
-            value_dict,
-            samples,
-            skip_encode=True,
-            return_latents=return_latents,
-            filter=None,
-            seed=seed,
-        )
+        if self.channels_last:
+            image = image.contiguous(memory_format=torch.channels_last)
+        with self._compiled_unet():
+            return do_img2img(
+                image,
+                self.model,
+                sampler,
+                value_dict,
+                samples,
+                skip_encode=True,
+                return_latents=return_latents,
+                filter=None,
+                seed=seed,
+                graph_denoiser=self._graph_denoiser,
+            )
+
+
+def _have_same_weights(a: torch.nn.Module, b: torch.nn.Module) -> bool:
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    sd_a, sd_b = a.state_dict(keep_vars=True), b.state_dict(keep_vars=True)
+    return sd_a.keys() == sd_b.keys() and all(
+        sd_a[k].shape == sd_b[k].shape and sd_a[k].data_ptr() == sd_b[k].data_ptr() for k in sd_a
+    )
 
 
 def get_guider_config(params):
@@ -187,64 +279,27 @@ def get_discretization_config(params):
     return discretization_config
 
 
+# Maps sampler names to their classes and the sampler-specific fields read from sampling params.
+_SAMPLERS = {
+    "EulerEDMSampler": (EulerEDMSampler, ("s_churn", "s_tmin", "s_tmax", "s_noise")),
+    "HeunEDMSampler": (HeunEDMSampler, ("s_churn", "s_tmin", "s_tmax", "s_noise")),
+    "EulerAncestralSampler": (EulerAncestralSampler, ("eta", "s_noise")),
+    "DPMPP2SAncestralSampler": (DPMPP2SAncestralSampler, ("eta", "s_noise")),
+    "DPMPP2MSampler": (DPMPP2MSampler, ()),
+    "LinearMultistepSampler": (LinearMultistepSampler, ("order",)),
+}
+
+
 def get_sampler_config(params):
     discretization_config = get_discretization_config(params)
     guider_config = get_guider_config(params)
-    sampler = None
-    if params.sampler == "EulerEDMSampler":
-        return EulerEDMSampler(
-            num_steps=params.steps,
-            discretization_config=discretization_config,
-            guider_config=guider_config,
-            s_churn=params.s_churn,
-            s_tmin=params.s_tmin,
-            s_tmax=params.s_tmax,
-            s_noise=params.s_noise,
-            verbose=True,
-        )
-    if params.sampler == "HeunEDMSampler":
-        return HeunEDMSampler(
-            num_steps=params.steps,
-            discretization_config=discretization_config,
-            guider_config=guider_config,
-            s_churn=params.s_churn,
-            s_tmin=params.s_tmin,
-            s_tmax=params.s_tmax,
-            s_noise=params.s_noise,
-            verbose=True,
-        )
-    if params.sampler == "EulerAncestralSampler":
-        return EulerAncestralSampler(
-            num_steps=params.steps,
-            discretization_config=discretization_config,
-            guider_config=guider_config,
-            eta=params.eta,
-            s_noise=params.s_noise,
-            verbose=True,
-        )
-    if params.sampler == "DPMPP2SAncestralSampler":
-        return DPMPP2SAncestralSampler(
-            num_steps=params.steps,
-            discretization_config=discretization_config,
-            guider_config=guider_config,
-            eta=params.eta,
-            s_noise=params.s_noise,
-            verbose=True,
-        )
-    if params.sampler == "DPMPP2MSampler":
-        return DPMPP2MSampler(
-            num_steps=params.steps,
-            discretization_config=discretization_config,
-            guider_config=guider_config,
-            verbose=True,
-        )
-    if params.sampler == "LinearMultistepSampler":
-        return LinearMultistepSampler(
-            num_steps=params.steps,
-            discretization_config=discretization_config,
-            guider_config=guider_config,
-            order=params.order,
-            verbose=True,
-        )
-
-    raise ValueError(f"unknown sampler {params.sampler}!")
+    if params.sampler not in _SAMPLERS:
+        raise ValueError(f"unknown sampler {params.sampler}!")
+    sampler_cls, sampler_fields = _SAMPLERS[params.sampler]
+    return sampler_cls(
+        num_steps=params.steps,
+        discretization_config=discretization_config,
+        guider_config=guider_config,
+        verbose=True,
+        **{field: getattr(params, field) for field in sampler_fields},
+    )
@@ -155,6 +155,7 @@ class FastPitchModel(SpectrogramGenerator, Exportable, FastPitchAdapterModelMixi
         speaker_emb_condition_aligner = cfg.get("speaker_emb_condition_aligner", False)
         min_token_duration = cfg.get("min_token_duration", 0)
         use_log_energy = cfg.get("use_log_energy", True)
+        use_triton = cfg.get("use_triton", False)
         if n_speakers > 1 and "add" not in input_fft.cond_input.condition_types:
             input_fft.cond_input.condition_types.append("add")
         if speaker_emb_condition_prosody:
@@ -181,6 +182,7 @@ class FastPitchModel(SpectrogramGenerator, Exportable, FastPitchAdapterModelMixi
             min_token_duration,
             cfg.max_token_duration,
             use_log_energy,
+            use_triton=use_triton,
         )
         self._input_types = self._output_types = None
         self.export_config = {
@@ -376,9 +376,9 @@ class FastPitchModel_SSL(ModelPT):
         enc_mask = enc_mask[:, :, None]
         if pitch_contour is not None and compute_pitch == False:
             if durs_gt is not None:
-                pitch = average_features(pitch_contour.unsqueeze(1), durs_gt).squeeze(1)
+                pitch = average_features(pitch_contour, durs_gt)
             elif durs is not None:
-                pitch = average_features(pitch_contour.unsqueeze(1), durs).squeeze(1)
+                pitch = average_features(pitch_contour, durs)
             else:
                 raise ValueError("durs or durs_gt must be provided")
 
@@ -234,7 +234,7 @@ class MixerTTSModel(SpectrogramGenerator, Exportable):
         if self.add_bin_loss:
             bin_loss = self.bin_loss(hard_attention=attn_hard, soft_attention=attn_soft)
             loss = loss + self.bin_loss_scale * bin_loss
-        true_avg_pitch = average_features(true_pitch.unsqueeze(1), attn_hard_dur).squeeze(1)
+        true_avg_pitch = average_features(true_pitch, attn_hard_dur)
 
         # Pitch loss
         pitch_loss = F.mse_loss(pred_pitch, true_avg_pitch, reduction='none')  # noqa
@@ -310,12 +310,12 @@ class MixerTTSModel(SpectrogramGenerator, Exportable):
         # Avg pitch, add pitch_emb
         if not self.training:
             if pitch is not None:
-                pitch = average_features(pitch.unsqueeze(1), attn_hard_dur).squeeze(1)
+                pitch = average_features(pitch, attn_hard_dur)
                 pitch_emb = self.pitch_emb(pitch.unsqueeze(1))
             else:
                 pitch_emb = self.pitch_emb(pitch_predicted.unsqueeze(1))
         else:
-            pitch = average_features(pitch.unsqueeze(1), attn_hard_dur).squeeze(1)
+            pitch = average_features(pitch, attn_hard_dur)
             pitch_emb = self.pitch_emb(pitch.unsqueeze(1))
 
         enc_out = enc_out + pitch_emb.transpose(1, 2)
@@ -376,7 +376,7 @@ class MixerTTSModel(SpectrogramGenerator, Exportable):
 
         # Avg pitch, pitch predictor
         if use_gt_durs and pitch is not None:
-            pitch = average_features(pitch.unsqueeze(1), attn_hard_dur).squeeze(1)
+            pitch = average_features(pitch, attn_hard_dur)
             pitch_emb = self.pitch_emb(pitch.unsqueeze(1))
         else:
             pitch_predicted = self.pitch_predictor(enc_out, enc_mask)
@@ -598,10 +598,7 @@ class MixerTTSModel(SpectrogramGenerator, Exportable):
                 pitches += [
                     wandb.Image(
                         plot_pitch_to_numpy(
-                            average_features(pitch.unsqueeze(1), attn_hard_dur)
-                            .squeeze(1)[i, : text_len[i]]
-                            .data.cpu()
-                            .numpy(),
+                            average_features(pitch, attn_hard_dur)[i, : text_len[i]].data.cpu().numpy(),
                             ylim_range=[-2.5, 2.5],
                         ),
                         caption=f"gt pitch {i}",
@@ -114,7 +114,7 @@ class TemporalPredictorAdapter(TemporalPredictor, adapter_mixins.AdapterModuleMi
             conv_layer.add_adapter(name, cfg)
 
     def is_adapter_available(self) -> bool:
-        return any([conv_layer.is_adapter_available() for conv_layer in self.layers])
+        return any(conv_layer.is_adapter_available() for conv_layer in self.layers)
 
     def set_enabled_adapters(self, name: Optional[str] = None, enabled: bool = True):
         for conv_layer in self.layers:  # type: adapter_mixins.AdapterModuleMixin
@@ -42,9 +42,14 @@
 # OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import contextlib
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
 import torch
 
 from nemo.collections.tts.modules.submodules import ConditionalInput, ConditionalLayerNorm
+from nemo.collections.tts.modules.transformer import FFTransformerDecoder, mask_from_lens
 from nemo.collections.tts.parts.utils.helpers import binarize_attention_parallel, regulate_len
 from nemo.core.classes import NeuralModule, adapter_mixins, typecheck
 from nemo.core.neural_types.elements import (
@@ -60,28 +65,112 @@ from nemo.core.neural_types.elements import (
     TokenLogDurationType,
 )
 from nemo.core.neural_types.neural_type import NeuralType
-
-
-def average_features(pitch, durs):
-    durs_cums_ends = torch.cumsum(durs, dim=1).long()
-    durs_cums_starts = torch.nn.functional.pad(durs_cums_ends[:, :-1], (1, 0))
-    pitch_nonzero_cums = torch.nn.functional.pad(torch.cumsum(pitch != 0.0, dim=2), (1, 0))
-    pitch_cums = torch.nn.functional.pad(torch.cumsum(pitch, dim=2), (1, 0))
-
-    bs, l = durs_cums_ends.size()
+from nemo.core.utils.optional_libs import TRITON_AVAILABLE
+
+if TRITON_AVAILABLE:
+    from nemo.collections.tts.parts.utils.average_features_triton import average_features_triton
+    from nemo.collections.tts.parts.utils.masked_transpose_triton import masked_transpose_triton
+
+
+def _average_segments(values, durs_cums):
+    """
+    Averages the non-zero ``values`` [..., T_audio] over the segments delimited by ``durs_cums`` [..., T_text + 1],
+    the cumulative durations with a leading zero. Returns [..., T_text], zero for segments without non-zero values.
+    """
+    # Segments are contiguous (each token starts where the previous one ends), so a single gather at the
+    # boundaries [0, end_0, end_1, ...] followed by a difference of neighbours gives all segment sums
+    values_cums = torch.nn.functional.pad(torch.cumsum(values, dim=-1), (1, 0)).gather(-1, durs_cums)
+    values_nonzero_cums = torch.nn.functional.pad(torch.cumsum(values != 0.0, dim=-1), (1, 0)).gather(-1, durs_cums)
+
+    values_sums = (values_cums[..., 1:] - values_cums[..., :-1]).float()
+    values_nelems = (values_nonzero_cums[..., 1:] - values_nonzero_cums[..., :-1]).float()
+
+    return torch.where(values_nelems == 0.0, values_nelems, values_sums / values_nelems.clamp_min(1.0))
+
+
+def average_features(pitch, durs, use_triton=False):
+    if pitch.dim() == 2:
+        # Single feature track [B, T_audio] -> [B, T_text]
+        return average_features_1d(pitch, durs, use_triton=use_triton)
+    if use_triton and TRITON_AVAILABLE and pitch.is_cuda and not torch.jit.is_tracing():
+        # Fused single-pass kernel; the implementation below materializes cumsums and gathers over [B, F, T].
+        return average_features_triton(pitch, durs)
+    durs_cums = torch.nn.functional.pad(torch.cumsum(durs, dim=1).long(), (1, 0))
+    bs, l = durs_cums.size()
     n_formants = pitch.size(1)
-    dcs = durs_cums_starts[:, None, :].expand(bs, n_formants, l)
-    dce = durs_cums_ends[:, None, :].expand(bs, n_formants, l)
-
-    pitch_sums = (torch.gather(pitch_cums, 2, dce) - torch.gather(pitch_cums, 2, dcs)).float()
-    pitch_nelems = (torch.gather(pitch_nonzero_cums, 2, dce) - torch.gather(pitch_nonzero_cums, 2, dcs)).float()
-
-    pitch_avg = torch.where(pitch_nelems == 0.0, pitch_nelems, pitch_sums / pitch_nelems)
-    return pitch_avg
+    return _average_segments(pitch, durs_cums[:, None, :].expand(bs, n_formants, l))
+
+
+def average_features_1d(values, durs, post_log1p=False, use_triton=False):
+    """
+    Same as ``average_features`` for a single feature track, without the singleton formant dimension.
+
+    Args:
+        values: frame-level values of size [B, T_audio]
+        durs: token durations of size [B, T_text]
+        post_log1p: apply ``log(1 + x)`` to the averages (fused into the Triton kernel on GPU)
+        use_triton: use the fused Triton kernel for CUDA tensors if Triton is available
+
+    Returns:
+        Tensor of size [B, T_text] with the average non-zero value per token (zero if there are none).
+    """
+    if use_triton and TRITON_AVAILABLE and values.is_cuda and not torch.jit.is_tracing():
+        return average_features_triton(values.unsqueeze(1), durs, post_log1p=post_log1p).squeeze(1)
+    values_avg = _average_segments(values, torch.nn.functional.pad(torch.cumsum(durs, dim=1).long(), (1, 0)))
+    if post_log1p:
+        values_avg = torch.log(1.0 + values_avg)
+    return values_avg
+
+
+def add_conv1d_embedding(enc, values, conv):
+    """
+    Computes ``enc + conv(values.unsqueeze(1)).transpose(1, 2)`` for a single-input-channel, stride-1 ``conv``
+    (such as pitch/energy embeddings) as one batched GEMM that accumulates directly into the ``[B, T, D]`` layout,
+    instead of a convolution, a strided read of its transposed output and a separate add.
+
+    Args:
+        enc: tensor of size [B, T, D]
+        values: tensor of size [B, T]
+        conv: ``torch.nn.Conv1d`` with 1 input channel and D output channels
+    """
+    assert conv.in_channels == 1, f"Expected a convolution with a single input channel, got {conv.in_channels}"
+    if not _is_plain_same_conv1d(conv):
+        # Hooks, parametrizations (e.g. weight_norm) and other convolution settings need Conv1d.forward
+        return enc + conv(values.unsqueeze(1)).transpose(1, 2)
+    kernel_size, padding = conv.kernel_size[0], conv.padding[0]
+    padded = torch.nn.functional.pad(values, (padding, padding))
+    # Shifted slices instead of Tensor.unfold, which cannot be exported to ONNX with a dynamic length.
+    windows = torch.stack([padded[:, k : k + values.shape[1]] for k in range(kernel_size)], dim=-1)  # [B, T, K]
+    weight = conv.weight.view(conv.out_channels, kernel_size).t()  # [K, D]
+    if conv.bias is not None:
+        # Fold the bias into the GEMM with a constant input column.
+        windows = torch.cat([windows, torch.ones_like(windows[..., :1])], dim=-1)
+        weight = torch.cat([weight, conv.bias.unsqueeze(0)], dim=0)
+    return torch.baddbmm(enc, windows, weight.unsqueeze(0).expand(enc.shape[0], -1, -1))
+
+
+def _is_plain_same_conv1d(conv):
+    # True if ``conv`` computes a plain length-preserving convolution from its ``weight`` and ``bias`` tensors
+    return (
+        type(conv) is torch.nn.Conv1d
+        and conv.stride == (1,)
+        and conv.dilation == (1,)
+        and conv.groups == 1
+        and conv.padding_mode == "zeros"
+        and isinstance(conv.padding, tuple)
+        and 2 * conv.padding[0] == conv.kernel_size[0] - 1
+        and not conv._forward_hooks
+        and not conv._forward_pre_hooks
+        and not torch.nn.utils.parametrize.is_parametrized(conv)
+    )
 
 
 def log_to_duration(log_dur, min_dur, max_dur, mask):
-    dur = torch.clamp(torch.exp(log_dur) - 1.0, min_dur, max_dur)
+    if torch.jit.is_tracing():
+        # expm1 has no ONNX counterpart
+        dur = torch.clamp(torch.exp(log_dur) - 1.0, min_dur, max_dur)
+    else:
+        dur = torch.clamp(torch.expm1(log_dur), min_dur, max_dur)
     dur *= mask.squeeze(2)
     return dur
 
@@ -92,23 +181,34 @@ class ConvReLUNorm(torch.nn.Module, adapter_mixins.AdapterModuleMixin):
         self.conv = torch.nn.Conv1d(in_channels, out_channels, kernel_size=kernel_size, padding=(kernel_size // 2))
         self.norm = ConditionalLayerNorm(out_channels, condition_dim=condition_dim, condition_types=condition_types)
         self.dropout = torch.nn.Dropout(dropout)
+        # Adapters are only ever added, so the check in forward does not need to inspect `adapter_layer`
+        self._has_adapters = False
+
+    def add_adapter(self, name, cfg, **kwargs):
+        super().add_adapter(name, cfg, **kwargs)
+        self._has_adapters = True
 
     def forward(self, signal, conditioning=None):
         out = torch.nn.functional.relu(self.conv(signal))
-        out = self.norm(out.transpose(1, 2), conditioning).transpose(1, 2)
+        # Stay in [B, T, D] for the norm, dropout and adapters, transpose back once
+        out = self.norm(out.transpose(1, 2), conditioning)
         out = self.dropout(out)
 
-        if self.is_adapter_available():
-            out = self.forward_enabled_adapters(out.transpose(1, 2)).transpose(1, 2)
+        if self._has_adapters:
+            out = self.forward_enabled_adapters(out)
 
-        return out
+        return out.transpose(1, 2)
 
 
 class TemporalPredictor(NeuralModule):
     """Predicts a single float per each temporal location"""
 
-    def __init__(self, input_size, filter_size, kernel_size, dropout, n_layers=2, condition_types=[]):
+    def __init__(
+        self, input_size, filter_size, kernel_size, dropout, n_layers=2, condition_types=[], use_triton=False
+    ):
         super(TemporalPredictor, self).__init__()
+        # Opt-in Triton kernel for masking and transposing the input on CUDA
+        self.use_triton = use_triton and TRITON_AVAILABLE
         self.cond_input = ConditionalInput(input_size, input_size, condition_types)
         self.layers = torch.nn.ModuleList()
         for i in range(n_layers):
@@ -143,17 +243,76 @@ class TemporalPredictor(NeuralModule):
 
     def forward(self, enc, enc_mask, conditioning=None):
         enc = self.cond_input(enc, conditioning)
-        out = enc * enc_mask
-        out = out.transpose(1, 2)
+        if self.use_triton and enc.is_cuda and not torch.jit.is_tracing():
+            # Masks and writes the channels-first layout of the convolutions in one pass
+            out = masked_transpose_triton(enc, enc_mask)
+        else:
+            out = enc * enc_mask
+            out = out.transpose(1, 2)
 
+        # Zero the padding after every convolution, so that it does not leak into the neighbouring valid tokens
+        conv_mask = enc_mask.transpose(1, 2)
         for layer in self.layers:
-            out = layer(out, conditioning=conditioning)
+            out = layer(out, conditioning=conditioning) * conv_mask
 
         out = out.transpose(1, 2)
         out = self.fc(out) * enc_mask
         return out.squeeze(-1)
 
 
+class _CUDAGraphRunner:
+    """
+    Captures ``fn`` into a CUDA graph on static copies of its (tensor or None) arguments.
+    Calling the runner copies new arguments of the same shapes into the static buffers and replays the graph.
+    The returned tensors are static buffers which are overwritten by the next call.
+    """
+
+    def __init__(self, fn, *args, num_warmup_iters=3):
+        self.static_args = [arg.clone() if arg is not None else None for arg in args]
+        # Warmup on a side stream, as required before capture (cuDNN/cuBLAS autotuning, lazy allocations)
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(stream):
+            for _ in range(num_warmup_iters):
+                fn(*self.static_args)
+        torch.cuda.current_stream().wait_stream(stream)
+
+        self.graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(self.graph):
+            self.static_outputs = fn(*self.static_args)
+
+    def __call__(self, *args):
+        for static_arg, arg in zip(self.static_args, args):
+            if static_arg is not None:
+                static_arg.copy_(arg)
+        self.graph.replay()
+        return self.static_outputs
+
+
+def _pow2_bucket(length, min_bucket):
+    return max(min_bucket, 1 << (length - 1).bit_length())
+
+
+class FastPitchOutput(NamedTuple):
+    """
+    Outputs of ``FastPitchModule.forward``, in the order of its ``output_types``.
+    Being a tuple, it can still be unpacked positionally and passes through typecheck unchanged.
+    """
+
+    spect: torch.Tensor
+    dec_lens: torch.Tensor
+    durs_predicted: torch.Tensor
+    log_durs_predicted: torch.Tensor
+    pitch_predicted: torch.Tensor
+    attn_soft: Optional[torch.Tensor]
+    attn_logprob: Optional[torch.Tensor]
+    attn_hard: Optional[torch.Tensor]
+    attn_hard_dur: Optional[torch.Tensor]
+    pitch: Optional[torch.Tensor]
+    energy_pred: Optional[torch.Tensor]
+    energy_tgt: Optional[torch.Tensor]
+
+
 class FastPitchModule(NeuralModule, adapter_mixins.AdapterModuleMixin):
     def __init__(
         self,
@@ -172,6 +331,8 @@ class FastPitchModule(NeuralModule, adapter_mixins.AdapterModuleMixin):
         min_token_duration: int = 0,
         max_token_duration: int = 75,
         use_log_energy: bool = True,
+        max_cuda_graphs: int = 8,
+        use_triton: bool = False,
     ):
         super().__init__()
 
@@ -186,6 +347,12 @@ class FastPitchModule(NeuralModule, adapter_mixins.AdapterModuleMixin):
         self.use_duration_predictor = True
         self.binarize = False
         self.use_log_energy = use_log_energy
+        # Opt-in Triton kernels for the CUDA training and inference paths, also enabled in the predictors
+        self.use_triton = use_triton and TRITON_AVAILABLE
+        if use_triton:
+            for predictor in (duration_predictor, pitch_predictor, energy_predictor):
+                if isinstance(predictor, TemporalPredictor):
+                    predictor.use_triton = self.use_triton
 
         # TODO: combine self.speaker_emb with self.speaker_encoder
         # cfg: remove `n_speakers`, create `speaker_encoder.lookup_module`
@@ -219,6 +386,11 @@ class FastPitchModule(NeuralModule, adapter_mixins.AdapterModuleMixin):
 
         self.proj = torch.nn.Linear(self.decoder.d_model, n_mel_channels, bias=True)
 
+        # CUDA graphs captured by infer_graphed, keyed by stage, static input shapes, dtype and device.
+        # Each graph keeps its own memory pool, so only the `max_cuda_graphs` most recently used ones are kept.
+        self.max_cuda_graphs = max_cuda_graphs
+        self._cuda_graphs = OrderedDict()
+
     @property
     def input_types(self):
         return {
@@ -297,7 +469,13 @@ class FastPitchModule(NeuralModule, adapter_mixins.AdapterModuleMixin):
         )
 
         # Input FFT
-        enc_out, enc_mask = self.encoder(input=text, conditioning=spk_emb)
+        if self.learn_alignment and spec is not None:
+            # The aligner takes the token embeddings, reuse the ones computed by the encoder
+            enc_out, enc_mask, text_emb = self.encoder(input=text, conditioning=spk_emb, return_word_emb=True)
+        else:
+            enc_out, enc_mask = self.encoder(input=text, conditioning=spk_emb)
+        # Convert the boolean mask once instead of in every predictor
+        enc_mask = enc_mask.to(enc_out.dtype)
 
         # Predict duration
         log_durs_predicted = self.duration_predictor(enc_out, enc_mask, conditioning=spk_emb)
@@ -307,7 +485,6 @@ class FastPitchModule(NeuralModule, adapter_mixins.AdapterModuleMixin):
 
         attn_soft, attn_hard, attn_hard_dur, attn_logprob = None, None, None, None
         if self.learn_alignment and spec is not None:
-            text_emb = self.encoder.word_emb(text)
             attn_soft, attn_logprob = self.aligner(
                 spec, text_emb.permute(0, 2, 1), enc_mask == 0, attn_prior, conditioning=spk_emb
             )
@@ -319,15 +496,13 @@ class FastPitchModule(NeuralModule, adapter_mixins.AdapterModuleMixin):
         if pitch is not None:
             if self.learn_alignment and pitch.shape[-1] != pitch_predicted.shape[-1]:
                 # Pitch during training is per spectrogram frame, but during inference, it should be per character
-                pitch = average_features(pitch.unsqueeze(1), attn_hard_dur).squeeze(1)
+                pitch = average_features_1d(pitch, attn_hard_dur, use_triton=self.use_triton)
             elif not self.learn_alignment:
                 # If alignment is not learnt attn_hard_dur is None, hence durs_predicted
-                pitch = average_features(pitch.unsqueeze(1), durs_predicted).squeeze(1)
-            pitch_emb = self.pitch_emb(pitch.unsqueeze(1))
+                pitch = average_features_1d(pitch, durs_predicted, use_triton=self.use_triton)
+            enc_out = add_conv1d_embedding(enc_out, pitch, self.pitch_emb)
         else:
-            pitch_emb = self.pitch_emb(pitch_predicted.unsqueeze(1))
-
-        enc_out = enc_out + pitch_emb.transpose(1, 2)
+            enc_out = add_conv1d_embedding(enc_out, pitch_predicted, self.pitch_emb)
 
         # Predict energy
         if self.energy_predictor is not None:
@@ -335,30 +510,25 @@ class FastPitchModule(NeuralModule, adapter_mixins.AdapterModuleMixin):
 
             if energy is not None:
                 # Average energy over characters
-                if self.learn_alignment:
-                    energy_tgt = average_features(energy.unsqueeze(1), attn_hard_dur)
-                else:
-                    energy_tgt = average_features(energy.unsqueeze(1), durs_predicted)
-                if self.use_log_energy:
-                    energy_tgt = torch.log(1.0 + energy_tgt)
-                energy_emb = self.energy_emb(energy_tgt)
-                energy_tgt = energy_tgt.squeeze(1)
+                energy_durs = attn_hard_dur if self.learn_alignment else durs_predicted
+                energy_tgt = average_features_1d(
+                    energy, energy_durs, post_log1p=self.use_log_energy, use_triton=self.use_triton
+                )
+                enc_out = add_conv1d_embedding(enc_out, energy_tgt, self.energy_emb)
             else:
-                energy_emb = self.energy_emb(energy_pred.unsqueeze(1))
+                enc_out = add_conv1d_embedding(enc_out, energy_pred, self.energy_emb)
                 energy_tgt = None
-
-            enc_out = enc_out + energy_emb.transpose(1, 2)
         else:
             energy_pred = None
             energy_tgt = None
 
         if self.learn_alignment and spec is not None:
-            len_regulated, dec_lens = regulate_len(attn_hard_dur, enc_out, pace)
+            len_regulated, dec_lens = regulate_len(attn_hard_dur, enc_out, pace, use_triton=self.use_triton)
         elif spec is None and durs is not None:
-            len_regulated, dec_lens = regulate_len(durs, enc_out, pace)
+            len_regulated, dec_lens = regulate_len(durs, enc_out, pace, use_triton=self.use_triton)
         # Use predictions during inference
         elif spec is None:
-            len_regulated, dec_lens = regulate_len(durs_predicted, enc_out, pace)
+            len_regulated, dec_lens = regulate_len(durs_predicted, enc_out, pace, use_triton=self.use_triton)
         else:
             raise ValueError(
                 f"Something unexpected happened when 'spec' is not None and 'self.learn_alignment' is False."
@@ -367,19 +537,19 @@ class FastPitchModule(NeuralModule, adapter_mixins.AdapterModuleMixin):
         # Output FFT
         dec_out, _ = self.decoder(input=len_regulated, seq_lens=dec_lens, conditioning=spk_emb)
         spect = self.proj(dec_out).transpose(1, 2)
-        return (
-            spect,
-            dec_lens,
-            durs_predicted,
-            log_durs_predicted,
-            pitch_predicted,
-            attn_soft,
-            attn_logprob,
-            attn_hard,
-            attn_hard_dur,
-            pitch,
-            energy_pred,
-            energy_tgt,
+        return FastPitchOutput(
+            spect=spect,
+            dec_lens=dec_lens,
+            durs_predicted=durs_predicted,
+            log_durs_predicted=log_durs_predicted,
+            pitch_predicted=pitch_predicted,
+            attn_soft=attn_soft,
+            attn_logprob=attn_logprob,
+            attn_hard=attn_hard,
+            attn_hard_dur=attn_hard_dur,
+            pitch=pitch,
+            energy_pred=energy_pred,
+            energy_tgt=energy_tgt,
         )
 
     def infer(
@@ -393,7 +563,39 @@ class FastPitchModule(NeuralModule, adapter_mixins.AdapterModuleMixin):
         volume=None,
         reference_spec=None,
         reference_spec_lens=None,
+        autocast_dtype=None,
     ):
+        """
+        Args:
+            autocast_dtype: if set (e.g. ``torch.bfloat16``), runs the encoder, predictors and decoder under autocast
+                with this dtype. Durations, pitch/energy embeddings and the output projection keep the parameter
+                dtype. Defaults to None: the caller's precision settings, including an enclosing autocast, apply.
+        """
+        inputs = dict(
+            text=text,
+            pitch=pitch,
+            speaker=speaker,
+            energy=energy,
+            pace=pace,
+            volume=volume,
+            reference_spec=reference_spec,
+            reference_spec_lens=reference_spec_lens,
+        )
+        if autocast_dtype is None:
+            return self._infer(**inputs, keep_dtype=None)
+        with torch.amp.autocast(text.device.type, dtype=autocast_dtype):
+            return self._infer(**inputs, keep_dtype=self.proj.weight.dtype)
+
+    def _infer(self, *, text, pitch, speaker, energy, pace, volume, reference_spec, reference_spec_lens, keep_dtype):
+        # With the autocast enabled by `infer`, the numerically sensitive parts run in `keep_dtype` (parameter dtype)
+        def keep(x):
+            return x if keep_dtype is None else x.to(keep_dtype)
+
+        def full_precision():
+            if keep_dtype is None:
+                return contextlib.nullcontext()
+            return torch.amp.autocast(text.device.type, enabled=False)
+
         # Calculate speaker embedding
         spk_emb = self.get_speaker_embedding(
             batch_size=text.shape[0],
@@ -404,35 +606,39 @@ class FastPitchModule(NeuralModule, adapter_mixins.AdapterModuleMixin):
 
         # Input FFT
         enc_out, enc_mask = self.encoder(input=text, conditioning=spk_emb)
+        enc_mask = enc_mask.to(enc_out.dtype)
 
         # Predict duration and pitch
-        log_durs_predicted = self.duration_predictor(enc_out, enc_mask, conditioning=spk_emb)
+        log_durs_predicted = keep(self.duration_predictor(enc_out, enc_mask, conditioning=spk_emb))
         durs_predicted = log_to_duration(
             log_dur=log_durs_predicted, min_dur=self.min_token_duration, max_dur=self.max_token_duration, mask=enc_mask
         )
-        pitch_predicted = self.pitch_predictor(enc_out, enc_mask, conditioning=spk_emb) + pitch
-        pitch_emb = self.pitch_emb(pitch_predicted.unsqueeze(1))
-        enc_out = enc_out + pitch_emb.transpose(1, 2)
+        pitch_predicted = keep(self.pitch_predictor(enc_out, enc_mask, conditioning=spk_emb)) + pitch
+        with full_precision():
+            enc_out = add_conv1d_embedding(keep(enc_out), pitch_predicted, self.pitch_emb)
 
         if self.energy_predictor is not None:
             if energy is not None:
                 assert energy.shape[-1] == text.shape[-1], f"energy.shape[-1]: {energy.shape[-1]} != len(text)"
-                energy_emb = self.energy_emb(energy)
+                with full_precision():
+                    energy_emb = self.energy_emb(energy)
+                enc_out = enc_out + energy_emb.transpose(1, 2)
             else:
-                energy_pred = self.energy_predictor(enc_out, enc_mask, conditioning=spk_emb).squeeze(-1)
-                energy_emb = self.energy_emb(energy_pred.unsqueeze(1))
-            enc_out = enc_out + energy_emb.transpose(1, 2)
+                energy_pred = keep(self.energy_predictor(enc_out, enc_mask, conditioning=spk_emb).squeeze(-1))
+                with full_precision():
+                    enc_out = add_conv1d_embedding(enc_out, energy_pred, self.energy_emb)
 
         # Expand to decoder time dimension
-        len_regulated, dec_lens = regulate_len(durs_predicted, enc_out, pace)
+        len_regulated, dec_lens = regulate_len(durs_predicted, enc_out, pace, use_triton=self.use_triton)
         volume_extended = None
         if volume is not None:
-            volume_extended, _ = regulate_len(durs_predicted, volume.unsqueeze(-1), pace)
+            volume_extended, _ = regulate_len(durs_predicted, volume.unsqueeze(-1), pace, use_triton=self.use_triton)
             volume_extended = volume_extended.squeeze(-1).float()
 
         # Output FFT
         dec_out, _ = self.decoder(input=len_regulated, seq_lens=dec_lens, conditioning=spk_emb)
-        spect = self.proj(dec_out).transpose(1, 2)
+        with full_precision():
+            spect = self.proj(keep(dec_out)).transpose(1, 2)
         return (
             spect.to(torch.float),
             dec_lens,
@@ -442,6 +648,138 @@ class FastPitchModule(NeuralModule, adapter_mixins.AdapterModuleMixin):
             volume_extended,
         )
 
+    def _infer_text_stage(self, text, pitch, speaker):
+        spk_emb = self.get_speaker_embedding(
+            batch_size=text.shape[0], speaker=speaker, reference_spec=None, reference_spec_lens=None
+        )
+        enc_out, enc_mask = self.encoder(input=text, conditioning=spk_emb)
+        enc_mask = enc_mask.to(enc_out.dtype)
+        log_durs_predicted = self.duration_predictor(enc_out, enc_mask, conditioning=spk_emb)
+        durs_predicted = log_to_duration(
+            log_dur=log_durs_predicted, min_dur=self.min_token_duration, max_dur=self.max_token_duration, mask=enc_mask
+        )
+        pitch_predicted = self.pitch_predictor(enc_out, enc_mask, conditioning=spk_emb) + pitch
+        enc_out = add_conv1d_embedding(enc_out, pitch_predicted, self.pitch_emb)
+        if self.energy_predictor is not None:
+            energy_pred = self.energy_predictor(enc_out, enc_mask, conditioning=spk_emb).squeeze(-1)
+            enc_out = add_conv1d_embedding(enc_out, energy_pred, self.energy_emb)
+        return enc_out, durs_predicted, log_durs_predicted, pitch_predicted, spk_emb
+
+    def _infer_decoder_stage(self, len_regulated, dec_lens, spk_emb):
+        # Static-length mask: the default mask_from_lens(dec_lens) depends on the values of dec_lens
+        mask = mask_from_lens(dec_lens, len_regulated.shape[1]).unsqueeze(2)
+        dec_out, _ = self.decoder._forward(len_regulated, mask, spk_emb)
+        return self.proj(dec_out).transpose(1, 2).to(torch.float)
+
+    def _run_graphed(self, key, fn, *args):
+        key = key + (self.proj.weight.dtype, self.proj.weight.device)
+        if key in self._cuda_graphs:
+            self._cuda_graphs.move_to_end(key)
+        else:
+            while self._cuda_graphs and len(self._cuda_graphs) >= self.max_cuda_graphs:
+                self._cuda_graphs.popitem(last=False)
+            self._cuda_graphs[key] = _CUDAGraphRunner(fn, *args)
+        return self._cuda_graphs[key](*args)
+
+    def reset_cuda_graphs(self):
+        """
+        Releases the CUDA graphs captured by ``infer_graphed`` (and their memory pools).
+        They are captured again on next use.
+        """
+        self._cuda_graphs.clear()
+
+    def _apply(self, fn, *args, **kwargs):
+        # .to(), .half(), .cuda() etc. replace parameter storage that captured graphs still point to
+        self.reset_cuda_graphs()
+        return super()._apply(fn, *args, **kwargs)
+
+    @torch.inference_mode()
+    def infer_graphed(self, *, text, pitch, speaker=None, pace=1.0, min_text_bucket=16, min_spec_bucket=128):
+        """
+        Same as ``infer`` without energy, volume and reference spectrogram inputs, but runs the encoder side
+        and the decoder side as CUDA graphs to remove per-kernel launch overhead, which dominates small-batch
+        (streaming) inference. The batch size, text length and regulated encoder output length are padded to
+        power-of-two buckets, so one graph is captured per bucket on first use. The padding is masked after every
+        convolution, so the outputs match those of ``infer`` on the unpadded inputs (up to floating point error).
+        Only the length regulation runs eagerly, as its output length depends on the predicted durations.
+        At most ``max_cuda_graphs`` graphs are kept (see also ``reset_cuda_graphs``).
+        Falls back to ``infer`` on CPU, in training mode, or if the decoder is not an ``FFTransformerDecoder``.
+        """
+        if not text.is_cuda or self.training or not isinstance(self.decoder, FFTransformerDecoder):
+            return self.infer(text=text, pitch=pitch, speaker=speaker, pace=pace)
+        return self._infer_bucketed(
+            text=text,
+            pitch=pitch,
+            speaker=speaker,
+            pace=pace,
+            min_text_bucket=min_text_bucket,
+            min_spec_bucket=min_spec_bucket,
+            run_stage=self._run_graphed,
+        )
+
+    def _infer_bucketed(self, *, text, pitch, speaker, pace, min_text_bucket, min_spec_bucket, run_stage):
+        # run_stage(key, fn, *args) runs a stage on inputs padded to the bucket sizes, as a CUDA graph or eagerly
+        batch_size, text_len = text.shape
+        # Repeats the last utterance up to a power-of-two batch size, so that varying batch sizes share graphs
+        batch_bucket = _pow2_bucket(batch_size, 1)
+        if batch_bucket > batch_size:
+            text = torch.cat([text, text[-1:].expand(batch_bucket - batch_size, -1)])
+            pitch = torch.cat([pitch, pitch[-1:].expand(batch_bucket - batch_size, -1)])
+            if speaker is not None:
+                speaker = torch.cat([speaker, speaker[-1:].expand(batch_bucket - batch_size)])
+        text_bucket = _pow2_bucket(text_len, min_text_bucket)
+        # Padded tokens are masked in the encoder and predictors and get zero durations, so they do not change results
+        text = torch.nn.functional.pad(text, (0, text_bucket - text_len), value=self.encoder.padding_idx)
+        pitch = torch.nn.functional.pad(pitch, (0, text_bucket - text_len))
+        enc_out, durs_predicted, log_durs_predicted, pitch_predicted, spk_emb = run_stage(
+            ("text", batch_bucket, text_bucket, speaker is not None), self._infer_text_stage, text, pitch, speaker
+        )
+
+        len_regulated, dec_lens = regulate_len(durs_predicted, enc_out, pace, use_triton=self.use_triton)
+        spec_len = len_regulated.shape[1]
+        spec_bucket = _pow2_bucket(spec_len, min_spec_bucket)
+        len_regulated = torch.nn.functional.pad(len_regulated, (0, 0, 0, spec_bucket - spec_len))
+        spect = run_stage(
+            ("decoder", batch_bucket, spec_bucket, spk_emb is not None),
+            self._infer_decoder_stage,
+            len_regulated,
+            dec_lens,
+            spk_emb,
+        )
+        return (
+            spect[:batch_size, :, :spec_len].clone(),
+            dec_lens[:batch_size],
+            durs_predicted[:batch_size, :text_len].clone(),
+            log_durs_predicted[:batch_size, :text_len].clone(),
+            pitch_predicted[:batch_size, :text_len].clone(),
+            None,
+        )
+
+    def infer_batch(self, texts, speaker=None, pitches=None, pace=1.0):
+        """
+        Runs inference for a list of utterances of different lengths as a single padded batch.
+        The batch goes through ``infer_graphed``, so on GPU it shares the captured CUDA graphs of its size buckets.
+        The padding is masked after every convolution, so the results match running ``infer`` on each text alone.
+
+        Args:
+            texts: list of token tensors of size [T_text_i]
+            speaker: optional tensor of size [B] with speaker ids
+            pitches: optional list of pitch tensors of size [T_text_i] added to the predicted pitch (zeros by default)
+            pace: speaking pace
+
+        Returns:
+            List of spectrograms of size [D, T_spec_i] and list of predicted durations of size [T_text_i].
+        """
+        text = torch.nn.utils.rnn.pad_sequence(texts, batch_first=True, padding_value=self.encoder.padding_idx)
+        if pitches is None:
+            pitch = torch.zeros(text.shape, dtype=torch.float, device=text.device)
+        else:
+            pitch = torch.nn.utils.rnn.pad_sequence(pitches, batch_first=True)
+        spect, dec_lens, durs_predicted, *_ = self.infer_graphed(text=text, pitch=pitch, speaker=speaker, pace=pace)
+        spects = [spect[i, :, :dec_len] for i, dec_len in enumerate(dec_lens.tolist())]
+        durs = [durs_predicted[i, : len(text_i)] for i, text_i in enumerate(texts)]
+        return spects, durs
+
 
 class FastPitchSSLModule(NeuralModule):
     def __init__(
@@ -522,13 +860,11 @@ class FastPitchSSLModule(NeuralModule):
                 if pitch.shape[-1] != enc_out.shape[1]:
                     # during inference, we send the averaged pitch over each token so we don't need to average here
                     # TODO: have a flag to indicate whether the pitch is already averaged or not
-                    pitch = average_features(pitch.unsqueeze(1), durs).squeeze(1)
+                    pitch = average_features_1d(pitch, durs)
 
-                pitch_emb = self.pitch_emb(pitch.unsqueeze(1))
+                enc_out = add_conv1d_embedding(enc_out, pitch, self.pitch_emb)
             else:
-                pitch_emb = self.pitch_emb(pitch_predicted.unsqueeze(1))
-
-            enc_out = enc_out + pitch_emb.transpose(1, 2)
+                enc_out = add_conv1d_embedding(enc_out, pitch_predicted, self.pitch_emb)
 
         if durs is not None:
             len_regulated, dec_lens = regulate_len(durs, enc_out, pace)
@@ -71,14 +71,21 @@ class PositionwiseConvFF(nn.Module):
         self.layer_norm = ConditionalLayerNorm(d_model, condition_dim=d_model, condition_types=condition_types)
         self.pre_lnorm = pre_lnorm
 
-    def forward(self, inp, conditioning=None):
-        return self._forward(inp, conditioning)
+    def forward(self, inp, conditioning=None, mask=None):
+        return self._forward(inp, conditioning, mask)
 
-    def _forward(self, inp, conditioning=None):
+    def _core_net(self, core_out, mask):
+        if mask is None:
+            return self.CoreNet(core_out)
+        # Zero the padding between the convolutions, so that it does not leak into the neighbouring valid frames
+        core_out = self.CoreNet[1](self.CoreNet[0](core_out)) * mask.transpose(1, 2)
+        return self.CoreNet[3](self.CoreNet[2](core_out))
+
+    def _forward(self, inp, conditioning=None, mask=None):
         if self.pre_lnorm:
             # layer normalization + positionwise feed-forward
             core_out = inp.transpose(1, 2)
-            core_out = self.CoreNet(self.layer_norm(core_out, conditioning).to(inp.dtype))
+            core_out = self._core_net(self.layer_norm(core_out, conditioning).to(inp.dtype), mask)
             core_out = core_out.transpose(1, 2)
 
             # residual connection
@@ -86,7 +93,7 @@ class PositionwiseConvFF(nn.Module):
         else:
             # positionwise feed-forward
             core_out = inp.transpose(1, 2)
-            core_out = self.CoreNet(core_out)
+            core_out = self._core_net(core_out, mask)
             core_out = core_out.transpose(1, 2)
 
             # residual connection + layer normalization
@@ -178,7 +185,7 @@ class TransformerLayer(nn.Module, adapter_mixins.AdapterModuleMixin):
     def forward(self, dec_inp, mask=None, conditioning=None):
         output = self.dec_attn(dec_inp, attn_mask=~mask.squeeze(2), conditioning=conditioning)
         output *= mask
-        output = self.pos_ff(output, conditioning)
+        output = self.pos_ff(output, conditioning, mask=mask)
         output *= mask
 
         if self.is_adapter_available():
@@ -303,9 +310,12 @@ class FFTransformerEncoder(FFTransformerDecoder):
             "conditioning": NeuralType(('B', 'T', 'D'), EncodedRepresentation(), optional=True),
         }
 
-    def forward(self, input, conditioning=0):
-
-        return self._forward(self.word_emb(input), (input != self.padding_idx).unsqueeze(2), conditioning)  # (B, L, 1)
+    def forward(self, input, conditioning=0, return_word_emb=False):
+        word_emb = self.word_emb(input)
+        out, mask = self._forward(word_emb, (input != self.padding_idx).unsqueeze(2), conditioning)  # (B, L, 1)
+        if return_word_emb:
+            return out, mask, word_emb
+        return out, mask
 
 
 class FFTransformer(nn.Module):
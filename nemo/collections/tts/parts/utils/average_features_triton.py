@@ -0,0 +1,192 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import torch
+import triton
+import triton.language as tl
+
+
+@triton.jit
+def _average_features_fwd_kernel(
+    values_ptr,
+    starts_ptr,
+    ends_ptr,
+    out_ptr,
+    counts_ptr,
+    num_features: int,
+    max_values_len: int,
+    max_tokens_len: int,
+    POST_LOG1P: tl.constexpr,
+    BLOCK_SIZE: tl.constexpr,
+):
+    """
+    Forward kernel for feature averaging. For each (batch, feature, token) accumulates the sum and the number
+    of non-zero values in a single pass over the token's frames. Stores the average (or ``log(1 + average)``
+    if `POST_LOG1P`) in `out_ptr` and the number of non-zero values in `counts_ptr` (used in backward).
+    Calculations are performed in float32 (but original tensors can use any precision).
+    """
+    row_i = tl.program_id(axis=0).to(tl.int64)  # batch_i * num_features + feature_i
+    token_i = tl.program_id(axis=1).to(tl.int64)
+    batch_i = row_i // num_features
+
+    start = tl.load(starts_ptr + batch_i * max_tokens_len + token_i)
+    end = tl.minimum(tl.load(ends_ptr + batch_i * max_tokens_len + token_i), max_values_len)
+    values_ptr += row_i * max_values_len
+
+    col_offsets = tl.arange(0, BLOCK_SIZE)
+    total = tl.zeros([BLOCK_SIZE], dtype=tl.float32)
+    count = tl.zeros([BLOCK_SIZE], dtype=tl.float32)
+    for offset in range(start, end, BLOCK_SIZE):
+        mask = offset + col_offsets < end
+        values = tl.load(values_ptr + offset + col_offsets, mask=mask, other=0.0).to(tl.float32)
+        total += values
+        count += (values != 0.0).to(tl.float32)
+    total_sum = tl.sum(total, axis=0)
+    count_sum = tl.sum(count, axis=0)
+
+    out_index = row_i * max_tokens_len + token_i
+    avg = tl.where(count_sum == 0.0, 0.0, total_sum / count_sum)
+    if POST_LOG1P:
+        avg = tl.log(1.0 + avg)
+    tl.store(out_ptr + out_index, avg)
+    tl.store(counts_ptr + out_index, count_sum)
+
+
+@triton.jit
+def _average_features_bwd_kernel(
+    grad_out_ptr,
+    starts_ptr,
+    ends_ptr,
+    counts_ptr,
+    grad_values_ptr,
+    num_features: int,
+    max_values_len: int,
+    max_tokens_len: int,
+    BLOCK_SIZE: tl.constexpr,
+):
+    """
+    Backward kernel for feature averaging. Scatters ``grad_out / count`` to every frame of the token
+    (zero for tokens without non-zero values, matching the forward output). Stores result in `grad_values_ptr`.
+    """
+    row_i = tl.program_id(axis=0).to(tl.int64)
+    token_i = tl.program_id(axis=1).to(tl.int64)
+    batch_i = row_i // num_features
+
+    start = tl.load(starts_ptr + batch_i * max_tokens_len + token_i)
+    end = tl.minimum(tl.load(ends_ptr + batch_i * max_tokens_len + token_i), max_values_len)
+    grad_values_ptr += row_i * max_values_len
+
+    out_index = row_i * max_tokens_len + token_i
+    count = tl.load(counts_ptr + out_index)
+    grad = tl.where(count == 0.0, 0.0, tl.load(grad_out_ptr + out_index).to(tl.float32) / count)
+
+    col_offsets = tl.arange(0, BLOCK_SIZE)
+    for offset in range(start, end, BLOCK_SIZE):
+        mask = offset + col_offsets < end
+        tl.store(grad_values_ptr + offset + col_offsets, tl.zeros([BLOCK_SIZE], dtype=tl.float32) + grad, mask=mask)
+
+
+class AverageFeatures(torch.autograd.Function):
+    """
+    Function to average frame-level features over token durations, supporting torch.autograd.
+    """
+
+    @staticmethod
+    def forward(ctx, values: torch.Tensor, durs: torch.Tensor, post_log1p: bool = False):
+        """
+
+        Args:
+            ctx: ctx object for storing the context
+            values: frame-level features of size [B, F, T_audio]
+            durs: token durations of size [B, T_text]
+            post_log1p: apply ``log(1 + x)`` to the averages
+
+        Returns:
+            Token-level averages of size [B, F, T_text] (float32)
+        """
+        values = values.contiguous()
+        # Same frame boundaries as the reference implementation: truncated cumulative durations.
+        ends = torch.cumsum(durs, dim=1).long().contiguous()
+        starts = torch.nn.functional.pad(ends[:, :-1], (1, 0)).contiguous()
+        batch_size, num_features, max_values_len = values.shape
+        max_tokens_len = durs.shape[1]
+
+        out = torch.empty([batch_size, num_features, max_tokens_len], dtype=torch.float32, device=values.device)
+        counts = torch.empty_like(out)
+        _average_features_fwd_kernel[(batch_size * num_features, max_tokens_len)](
+            values_ptr=values,
+            starts_ptr=starts,
+            ends_ptr=ends,
+            out_ptr=out,
+            counts_ptr=counts,
+            num_features=num_features,
+            max_values_len=max_values_len,
+            max_tokens_len=max_tokens_len,
+            POST_LOG1P=post_log1p,
+            BLOCK_SIZE=128,
+        )
+
+        ctx.save_for_backward(starts, ends, counts, out if post_log1p else None)
+        ctx.values_shape = values.shape
+        ctx.values_dtype = values.dtype
+        return out
+
+    @staticmethod
+    def backward(ctx, grad_out):
+        """
+        Backward calculation for feature averaging.
+
+        Args:
+            ctx: ctx object for storing the context
+            grad_out: upstream gradient for the averages
+
+        Returns:
+            gradient for values, None for durations and post_log1p
+        """
+        starts, ends, counts, out = ctx.saved_tensors
+        if out is not None:
+            # d/dx log(1 + x) = 1 / (1 + x) = exp(-out)
+            grad_out = grad_out * torch.exp(-out)
+        batch_size, num_features, max_values_len = ctx.values_shape
+        max_tokens_len = starts.shape[1]
+        grad_values = torch.zeros(ctx.values_shape, dtype=torch.float32, device=grad_out.device)
+        _average_features_bwd_kernel[(batch_size * num_features, max_tokens_len)](
+            grad_out_ptr=grad_out.contiguous(),
+            starts_ptr=starts,
+            ends_ptr=ends,
+            counts_ptr=counts,
+            grad_values_ptr=grad_values,
+            num_features=num_features,
+            max_values_len=max_values_len,
+            max_tokens_len=max_tokens_len,
+            BLOCK_SIZE=128,
+        )
+        return grad_values.to(ctx.values_dtype), None, None
+
+
+def average_features_triton(values: torch.Tensor, durs: torch.Tensor, post_log1p: bool = False) -> torch.Tensor:
+    """
+    Averages frame-level ``values`` over the frames of each token given by ``durs``, ignoring zero values
+    (e.g. unvoiced pitch frames). Optimized implementation in Triton: a single pass over the frames of every token,
+    without materializing cumulative sums of ``values``.
+
+    Args:
+        values: frame-level features of size [B, F, T_audio]
+        durs: token durations of size [B, T_text]
+        post_log1p: apply ``log(1 + x)`` to the averages in the same kernel
+
+    Returns:
+        Tensor of size [B, F, T_text] with the average non-zero value per token (zero if there are none).
+    """
+    return AverageFeatures.apply(values, durs, post_log1p)
@@ -53,9 +53,13 @@ import torch
 from numba import jit, prange
 
 from nemo.collections.tts.torch.tts_data_types import DATA_STR2DATA_CLASS, MAIN_DATA_TYPES, WithLens
+from nemo.core.utils.optional_libs import TRITON_AVAILABLE
 from nemo.utils import logging
 from nemo.utils.decorators import deprecated
 
+if TRITON_AVAILABLE:
+    from nemo.collections.tts.parts.utils.regulate_len_triton import regulate_len_triton
+
 HAVE_WANDB = True
 try:
     import wandb
@@ -692,6 +696,7 @@ def regulate_len(
     mel_max_len=None,
     group_size=1,
     dur_lens: torch.tensor = None,
+    use_triton: bool = False,
 ):
     """A function that takes predicted durations per encoded token, and repeats enc_out according to the duration.
     NOTE: durations.shape[1] == enc_out.shape[1]
@@ -705,6 +710,7 @@ def regulate_len(
         group_size (int): replicate the last element specified by durations[i, in_lens[i] - 1] until the
             full length of the sequence is the next nearest multiple of group_size
         in_lens (torch.tensor): input sequence length specifying valid values in the durations input tensor (only needed if group_size >1)
+        use_triton (bool): use the Triton kernel for CUDA tensors if Triton is available. Defaults to False.
     """
 
     dtype = enc_out.dtype
@@ -719,13 +725,17 @@ def regulate_len(
         dec_lens = reps.sum(dim=1)
 
     max_len = dec_lens.max()
-    reps_cumsum = torch.cumsum(torch.nn.functional.pad(reps, (1, 0, 0, 0), value=0.0), dim=1)[:, None, :]
-    reps_cumsum = reps_cumsum.to(dtype=dtype, device=enc_out.device)
+    if use_triton and TRITON_AVAILABLE and enc_out.is_cuda and not torch.jit.is_tracing():
+        # Copies every token to its frames in one pass instead of multiplying by a [B, T_spec, T_text] selection matrix
+        enc_rep = regulate_len_triton(enc_out, reps, int(max_len))
+    else:
+        reps_cumsum = torch.cumsum(torch.nn.functional.pad(reps, (1, 0, 0, 0), value=0.0), dim=1)[:, None, :]
+        reps_cumsum = reps_cumsum.to(dtype=dtype, device=enc_out.device)
 
-    range_ = torch.arange(max_len).to(enc_out.device)[None, :, None]
-    mult = (reps_cumsum[:, :, :-1] <= range_) & (reps_cumsum[:, :, 1:] > range_)
-    mult = mult.to(dtype)
-    enc_rep = torch.matmul(mult, enc_out)
+        range_ = torch.arange(max_len).to(enc_out.device)[None, :, None]
+        mult = (reps_cumsum[:, :, :-1] <= range_) & (reps_cumsum[:, :, 1:] > range_)
+        mult = mult.to(dtype)
+        enc_rep = torch.matmul(mult, enc_out)
 
     if mel_max_len is not None:
         enc_rep = enc_rep[:, :mel_max_len]
@@ -0,0 +1,133 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import torch
+import triton
+import triton.language as tl
+
+
+@triton.jit
+def _masked_transpose_kernel(
+    in_ptr,
+    mask_ptr,
+    out_ptr,
+    max_len: int,
+    hidden_dim: int,
+    in_stride_t: int,
+    in_stride_d: int,
+    out_stride_t: int,
+    out_stride_d: int,
+    BLOCK_T: tl.constexpr,
+    BLOCK_D: tl.constexpr,
+):
+    """
+    Multiplies a [T, D] tile of each batch element by the [T] mask and stores it with different strides,
+    i.e. masks and transposes in a single pass. Used for both forward ([B, T, D] -> [B, D, T])
+    and backward ([B, D, T] -> [B, T, D]) by swapping the strides.
+    """
+    batch_i = tl.program_id(axis=0).to(tl.int64)
+    t_offsets = tl.program_id(axis=1) * BLOCK_T + tl.arange(0, BLOCK_T)
+    d_offsets = tl.program_id(axis=2) * BLOCK_D + tl.arange(0, BLOCK_D)
+    t_mask = t_offsets < max_len
+    tile_mask = t_mask[:, None] & (d_offsets < hidden_dim)[None, :]
+
+    in_ptr += batch_i * max_len * hidden_dim
+    out_ptr += batch_i * max_len * hidden_dim
+    values = tl.load(
+        in_ptr + t_offsets[:, None] * in_stride_t + d_offsets[None, :] * in_stride_d, mask=tile_mask, other=0.0
+    )
+    mask = tl.load(mask_ptr + batch_i * max_len + t_offsets, mask=t_mask, other=0.0)
+    tl.store(
+        out_ptr + t_offsets[:, None] * out_stride_t + d_offsets[None, :] * out_stride_d,
+        values * mask[:, None],
+        mask=tile_mask,
+    )
+
+
+def _masked_transpose(values: torch.Tensor, mask: torch.Tensor, channels_last_input: bool) -> torch.Tensor:
+    if channels_last_input:
+        batch_size, max_len, hidden_dim = values.shape
+        out = torch.empty([batch_size, hidden_dim, max_len], dtype=values.dtype, device=values.device)
+        in_strides, out_strides = (hidden_dim, 1), (1, max_len)
+    else:
+        batch_size, hidden_dim, max_len = values.shape
+        out = torch.empty([batch_size, max_len, hidden_dim], dtype=values.dtype, device=values.device)
+        in_strides, out_strides = (1, max_len), (hidden_dim, 1)
+    block_t, block_d = 32, 32
+    _masked_transpose_kernel[(batch_size, triton.cdiv(max_len, block_t), triton.cdiv(hidden_dim, block_d))](
+        in_ptr=values,
+        mask_ptr=mask,
+        out_ptr=out,
+        max_len=max_len,
+        hidden_dim=hidden_dim,
+        in_stride_t=in_strides[0],
+        in_stride_d=in_strides[1],
+        out_stride_t=out_strides[0],
+        out_stride_d=out_strides[1],
+        BLOCK_T=block_t,
+        BLOCK_D=block_d,
+    )
+    return out
+
+
+class MaskedTranspose(torch.autograd.Function):
+    """
+    Function to mask and transpose [B, T, D] features to [B, D, T], supporting torch.autograd.
+    """
+
+    @staticmethod
+    def forward(ctx, values: torch.Tensor, mask: torch.Tensor):
+        """
+
+        Args:
+            ctx: ctx object for storing the context
+            values: features of size [B, T, D]
+            mask: mask of size [B, T, 1]
+
+        Returns:
+            Contiguous tensor of size [B, D, T] equal to ``(values * mask).transpose(1, 2)``
+        """
+        mask = mask.squeeze(2).to(values.dtype).contiguous()
+        ctx.save_for_backward(mask)
+        return _masked_transpose(values.contiguous(), mask, channels_last_input=True)
+
+    @staticmethod
+    def backward(ctx, grad_out):
+        """
+        Backward calculation for masked transpose.
+
+        Args:
+            ctx: ctx object for storing the context
+            grad_out: upstream gradient of size [B, D, T]
+
+        Returns:
+            gradient for values, None for mask
+        """
+        (mask,) = ctx.saved_tensors
+        return _masked_transpose(grad_out.contiguous(), mask.to(grad_out.dtype), channels_last_input=False), None
+
+
+def masked_transpose_triton(values: torch.Tensor, mask: torch.Tensor) -> torch.Tensor:
+    """
+    Computes ``(values * mask).transpose(1, 2)`` as a contiguous tensor in a single pass. Optimized implementation
+    in Triton: the masking and the layout change for the following Conv1d are done by one kernel.
+
+    Args:
+        values: features of size [B, T, D]
+        mask: mask of size [B, T, 1]
+
+    Returns:
+        Tensor of size [B, D, T].
+    """
+    return MaskedTranspose.apply(values, mask)
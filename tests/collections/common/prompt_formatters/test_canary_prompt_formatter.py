@@ -12,7 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from nemo.collections.common.prompts.canary import CanaryPromptFormatter
+import pytest
+
+from nemo.collections.common.prompts.canary import (
+    _PNC_MAP,
+    _TASK_MAP,
+    CanaryPromptFormatter,
+    map_manifest_values_to_special_tokens,
+)
+from nemo.collections.common.prompts.formatter import PromptFormatter
+from nemo.collections.common.tokenizers.canary_tokenizer import CANARY_NOPNC, CANARY_PNC, CANARY_SPECIAL_TOKENIZER
 
 
 def test_canary_prompt_formatter_training(canary_tokenizer):
@@ -62,3 +71,102 @@ def test_canary_prompt_formatter_inference(canary_tokenizer):
     assert ans["input_ids"].tolist() == ans["context_ids"].tolist()
     assert canary_tokenizer.ids_to_text(ans["input_ids"].tolist()) == '<|startoftranscript|><|en|><|transcribe|><|en|><|pnc|>'
     # fmt: on
+
+
+def test_canary_prompt_formatter_user_turn_cache(canary_tokenizer):
+    formatter = CanaryPromptFormatter(canary_tokenizer)
+    turns = [
+        {
+            "role": "user",
+            "slots": {
+                "source_lang": "en",
+                "target_lang": "en",
+                "task": "asr",
+                "pnc": "yes",
+                "prompt_language": "spl_tokens",
+            },
+        },
+        {"role": "assistant", "slots": {"text": "TEST", "prompt_language": "en"}},
+    ]
+    ans = formatter.encode_dialog(turns)
+    ans_cached = formatter.encode_dialog(turns)
+    assert len(formatter._user_turn_cache) == 1
+    for key in ans:
+        assert ans[key].tolist() == ans_cached[key].tolist()
+    # fmt: off
+    assert canary_tokenizer.ids_to_text(ans_cached["context_ids"].tolist()) == '<|startoftranscript|><|en|><|transcribe|><|en|><|pnc|>'
+    # fmt: on
+
+    turns[0]["slots"]["pnc"] = "no"
+    ans = formatter.encode_dialog(turns)
+    assert len(formatter._user_turn_cache) == 2
+    # fmt: off
+    assert canary_tokenizer.ids_to_text(ans["context_ids"].tolist()) == '<|startoftranscript|><|en|><|transcribe|><|en|><|nopnc|>'
+    # fmt: on
+
+
+def _map_manifest_values_to_special_tokens_reference(slot_values: dict[str, str]) -> dict[str, str]:
+    # Straightforward implementation of the slot normalization, without lookup tables or the fast path.
+    slot_values = slot_values.copy()
+    any_special_token_present = False
+    for k in ("source_lang", "target_lang"):
+        if k in slot_values and not (slot_values[k].startswith("<|") and slot_values[k].endswith("|>")):
+            slot_values[k] = "<|" + slot_values[k] + "|>"
+            any_special_token_present = True
+    k = "pnc"
+    if k in slot_values and slot_values[k] not in (CANARY_PNC, CANARY_NOPNC):
+        slot_values[k] = CANARY_PNC if slot_values[k] in ("yes", "1", "True", "true", "pnc") else CANARY_NOPNC
+        any_special_token_present = True
+    for k in ("task", "taskname"):
+        if k in slot_values and slot_values[k] not in ("<|transcribe|>", "<|translate|>"):
+            if slot_values[k] in {"translate", "ast", "s2t_translation"}:
+                slot_values["task"] = "<|translate|>"
+            elif slot_values[k] in {"transcribe", "asr"}:
+                slot_values["task"] = "<|transcribe|>"
+            any_special_token_present = True
+    if any_special_token_present and PromptFormatter.PROMPT_LANGUAGE_SLOT not in slot_values:
+        slot_values[PromptFormatter.PROMPT_LANGUAGE_SLOT] = CANARY_SPECIAL_TOKENIZER
+    return slot_values
+
+
+@pytest.mark.parametrize(
+    "slot_values",
+    [
+        # already normalized (fast path)
+        {"source_lang": "<|en|>", "target_lang": "<|de|>", "task": "<|translate|>", "pnc": "<|pnc|>"},
+        {"source_lang": "<|en|>", "target_lang": "<|en|>", "taskname": "<|transcribe|>", "pnc": "<|nopnc|>"},
+        {"source_lang": "<|en|>", "task": "<|transcribe|>", "prompt_language": "spl_tokens", "text": "TEST"},
+        {"text": "TEST"},
+        # mixed
+        {"source_lang": "<|en|>", "target_lang": "de", "task": "<|translate|>", "pnc": "<|pnc|>"},
+        {"source_lang": "<|en|>", "target_lang": "<|en|>", "task": "asr", "pnc": "<|nopnc|>"},
+        {"source_lang": "<|en|>", "target_lang": "<|en|>", "task": "<|transcribe|>", "pnc": "no"},
+        {"source_lang": "en", "target_lang": "<|en|>", "taskname": "<|transcribe|>", "prompt_language": "en"},
+        # raw manifest values
+        {"source_lang": "en", "target_lang": "de", "task": "ast", "pnc": "yes"},
+        {"source_lang": "en", "target_lang": "en", "taskname": "transcribe", "pnc": "1"},
+        {"source_lang": "en", "target_lang": "es", "task": "s2t_translation", "pnc": "False"},
+        {"source_lang": "fr", "target_lang": "fr", "task": "asr", "pnc": "pnc"},
+    ],
+)
+def test_canary_map_manifest_values_to_special_tokens(slot_values):
+    original = slot_values.copy()
+    assert map_manifest_values_to_special_tokens(slot_values) == _map_manifest_values_to_special_tokens_reference(
+        slot_values
+    )
+    assert slot_values == original
+
+
+@pytest.mark.parametrize("value", list(_PNC_MAP) + ["no", "False", "0", "nopnc", ""])
+def test_canary_pnc_map(value):
+    ans = map_manifest_values_to_special_tokens({"pnc": value})
+    assert ans == _map_manifest_values_to_special_tokens_reference({"pnc": value})
+
+
+@pytest.mark.parametrize("value", list(_TASK_MAP))
+def test_canary_task_map(value):
+    for slot in ("task", "taskname"):
+        ans = map_manifest_values_to_special_tokens({slot: value})
+        assert ans == _map_manifest_values_to_special_tokens_reference({slot: value})
+    with pytest.raises(AssertionError):
+        map_manifest_values_to_special_tokens({"task": "unknown"})
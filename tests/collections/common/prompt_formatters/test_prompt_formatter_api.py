@@ -159,3 +159,17 @@ def test_prompt_formatter_wrong_preamble_excpetions(bpe_tokenizer):
                 {"role": "preamble", "slots": {"abc": "abc"}},
             ]
         )
+
+
+def test_prompt_formatter_templates_presplit():
+    parts = _DummyPromptFormatter._TEMPLATE_PARTS[("<s>|text|</s>", frozenset({"text"}))]
+    assert parts == ("<s>", "text", "</s>")
+
+
+def test_prompt_formatter_encode_turn_value_containing_slot_marker(bpe_tokenizer):
+    formatter = _DummyPromptFormatter(bpe_tokenizer)
+    # Slots are filled in a single pass: a value that looks like a slot marker is not substituted again.
+    ids = formatter.encode_turn(
+        "|text| |other|", {"text": Modality.Text, "other": Modality.Text}, {"text": "|other|", "other": "x"}
+    )
+    assert bpe_tokenizer.ids_to_text(ids) == "|other| x"
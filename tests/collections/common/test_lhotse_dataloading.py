@@ -440,6 +440,73 @@ def test_dataloader_from_lhotse_shar_cuts(cutset_shar_path: Path):
     assert b["audio"].shape[0] == b["audio_lens"].shape[0] == 3
 
 
+def test_lhotse_shar_split_for_dataloading(cutset_shar_path: Path):
+    from nemo.collections.common.data.lhotse.cutset import read_cutset_from_config
+
+    config = OmegaConf.create(
+        {
+            "shar_path": cutset_shar_path,
+            "shard_seed": 0,
+            "shar_split_for_dataloading": True,
+            "metadata_only": False,
+            "force_finite": False,
+            "max_open_streams": None,
+        }
+    )
+    cuts, is_tarred = read_cutset_from_config(config)
+    assert is_tarred
+
+    # Outside of DDP / dataloading workers every shard belongs to the current process;
+    # each epoch sees all of the data exactly once and the shard order is reshuffled with seed + epoch.
+    epochs = [list(islice(cuts, 10)), list(islice(cuts, 10, 20))]
+    for epoch, epoch_cuts in enumerate(epochs):
+        assert sorted(c.id for c in epoch_cuts) == [f"dummy-mono-cut-{i:04d}_repeat{epoch}" for i in range(10)]
+        assert all(c.shar_epoch == epoch for c in epoch_cuts)
+
+    config.shard_seed = "trng"
+    with pytest.raises(AssertionError):
+        read_cutset_from_config(config)
+
+
+def test_dataloader_from_lhotse_shar_cuts_with_prefetching(cutset_shar_path: Path):
+    config = OmegaConf.create(
+        {
+            "shar_path": cutset_shar_path,
+            "sample_rate": 16000,
+            "shuffle": True,
+            "use_lhotse": True,
+            "num_workers": 0,
+            "batch_size": 3,
+            "seed": 0,
+            "shard_seed": 0,
+            "prefetch_buffer_size": 4,
+        }
+    )
+    dl = get_lhotse_dataloader_from_config(
+        config=config, global_rank=0, world_size=1, dataset=UnsupervisedAudioDataset()
+    )
+    config.prefetch_buffer_size = 0
+    dl_ref = get_lhotse_dataloader_from_config(
+        config=config, global_rank=0, world_size=1, dataset=UnsupervisedAudioDataset()
+    )
+    for b, b_ref in zip(islice(dl, 4), islice(dl_ref, 4)):
+        assert b["ids"] == b_ref["ids"]
+        torch.testing.assert_close(b["audio"], b_ref["audio"])
+
+
+def test_lazy_prefetching_iterator_propagates_errors():
+    from nemo.collections.common.data.lhotse.iterators import LazyPrefetchingIterator
+
+    def items():
+        yield from range(5)
+        raise RuntimeError("data error")
+
+    it = iter(LazyPrefetchingIterator(items(), buffer_size=2))
+    assert list(islice(it, 5)) == [0, 1, 2, 3, 4]
+    with pytest.raises(RuntimeError, match="data error"):
+        next(it)
+
+
 def test_dataloader_from_lhotse_shar_cuts_via_fields(cutset_shar_path: Path):
     config = OmegaConf.create(
         {
@@ -12,13 +12,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+
 import numpy as np
 import pytest
 from lhotse import AudioSource, CutSet, MonoCut, Recording, SupervisionSegment
-from lhotse.serialization import save_to_jsonl
+from lhotse.lazy import LazyJsonlIterator
+from lhotse.serialization import load_jsonl, save_to_jsonl
 from lhotse.testing.dummies import DummyManifest
 
-from nemo.collections.common.data.lhotse.nemo_adapters import LazyNeMoIterator
+from nemo.collections.common.data.lhotse.nemo_adapters import (
+    LazyArrowJsonlIterator,
+    LazyNeMoIterator,
+    LazyReadaheadJsonlIterator,
+    _arrow_cached_manifest,
+)
 
 
 @pytest.fixture
@@ -78,6 +86,97 @@ def test_lazy_nemo_iterator(nemo_manifest_path):
         assert s.language == "en"
 
 
+def test_lazy_nemo_iterator_arrow_cache(nemo_manifest_path):
+    pytest.importorskip("pyarrow")
+
+    expected = list(CutSet(LazyNeMoIterator(nemo_manifest_path)))
+    cuts = CutSet(LazyNeMoIterator(nemo_manifest_path, use_arrow_cache=True))
+    assert (nemo_manifest_path.parent / "nemo_manifest.json.arrow").is_file()
+
+    assert len(cuts) == 2
+    for c, c_ref in zip(cuts, expected):
+        assert c.id == c_ref.id
+        assert c.duration == c_ref.duration
+        assert c.recording == c_ref.recording
+        assert c.supervisions[0].text == c_ref.supervisions[0].text
+        assert c.supervisions[0].language == c_ref.supervisions[0].language
+
+
+def test_lazy_arrow_jsonl_iterator_matches_jsonl(tmp_path):
+    pytest.importorskip("pyarrow")
+
+    items = [
+        {"audio_filepath": "a.wav", "duration": 1.5, "text": "a", "lang": "en"},
+        {"audio_filepath": "b.wav", "duration": 2.0, "text": None, "lang": "en"},
+        {"audio_filepath": "c.wav", "duration": 0.5, "text": "c"},
+        {"audio_filepath": "d.wav", "duration": 1.0, "text": "d", "lang": None},
+        {"audio_filepath": "e.wav", "duration": 3.0, "text": "e", "lang": "de"},
+    ]
+    p = tmp_path / "manifest.json"
+    save_to_jsonl(items, p)
+
+    # Several record batches, with null values and missing keys.
+    _arrow_cached_manifest(p, batch_size=2)
+    assert list(LazyArrowJsonlIterator(p)) == list(LazyJsonlIterator(p)) == items
+    assert len(LazyArrowJsonlIterator(p)) == len(items)
+
+    # Keys that are not present in the first batch are rejected, the caller falls back to JSON lines.
+    save_to_jsonl(items + [{"audio_filepath": "f.wav", "duration": 1.0, "speaker": 1}], p)
+    with pytest.raises(ValueError):
+        _arrow_cached_manifest(p, batch_size=2)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_lazy_arrow_jsonl_iterator_cache_invalidation(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    from nemo.collections.common.data.lhotse import nemo_adapters
+
+    items = [{"audio_filepath": f"{i}.wav", "duration": float(i)} for i in range(3)]
+    p = tmp_path / "manifest.json"
+    save_to_jsonl(items, p)
+    assert list(LazyArrowJsonlIterator(p)) == items
+
+    # A manifest replaced by a file with an older modification time (e.g. ``cp -p``) is not served from the cache.
+    mtime = p.stat().st_mtime
+    save_to_jsonl(items[:2], p)
+    os.utime(p, (mtime - 100, mtime - 100))
+    assert list(LazyArrowJsonlIterator(p)) == items[:2]
+
+    # Conversion failures during iteration fall back to reading the JSON lines.
+    save_to_jsonl(items, p)
+
+    def _fail(*args, **kwargs):
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr(nemo_adapters, "_arrow_cached_manifest", _fail)
+    iterator = LazyArrowJsonlIterator(p)
+    assert list(iterator) == items
+    assert len(iterator) == len(items)
+
+
+def test_lazy_nemo_iterator_readahead_io_backend(nemo_manifest_path):
+    expected = list(CutSet(LazyNeMoIterator(nemo_manifest_path)))
+    cuts = CutSet(LazyNeMoIterator(nemo_manifest_path, io_backend="readahead"))
+
+    assert len(cuts) == 2
+    for c, c_ref in zip(cuts, expected):
+        assert c.id == c_ref.id
+        assert c.duration == c_ref.duration
+        assert c.recording == c_ref.recording
+        assert c.supervisions[0].text == c_ref.supervisions[0].text
+
+    # Lines spanning several chunks are reassembled correctly.
+    items = list(LazyReadaheadJsonlIterator(nemo_manifest_path, chunk_size=7, queue_depth=2))
+    assert items == list(load_jsonl(nemo_manifest_path))
+
+    # Compressed manifests are read with LazyJsonlIterator.
+    gz_path = nemo_manifest_path.parent / "nemo_manifest.jsonl.gz"
+    save_to_jsonl(load_jsonl(nemo_manifest_path), gz_path)
+    cuts = CutSet(LazyNeMoIterator(gz_path, io_backend="readahead"))
+    assert [c.id for c in cuts] == [c.id for c in expected]
+    assert [c.supervisions[0].text for c in cuts] == [c.supervisions[0].text for c in expected]
+
+
 @pytest.fixture
 def nemo_offset_manifest_path(tmp_path_factory):
     """
@@ -0,0 +1,65 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+import torch
+
+from nemo.collections.multimodal.parts.stable_diffusion.sdxl_pipeline import SamplingPipeline
+
+
+class TinyEncoder(torch.nn.Module):
+    num_resolutions = 4
+
+    def __init__(self):
+        super().__init__()
+        self.conv = torch.nn.Conv2d(3, 4, kernel_size=3)
+
+
+class TinyVAE(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.encoder = TinyEncoder()
+
+
+class TinyDiffusionEngine(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.model = torch.nn.Conv2d(4, 4, kernel_size=3)
+        self.conditioner = torch.nn.Linear(8, 8)
+        self.first_stage_model = TinyVAE()
+
+
+@pytest.mark.unit
+def test_sampling_pipeline_from_shared():
+    base = SamplingPipeline(TinyDiffusionEngine(), device="cpu", use_fp16=False)
+
+    refiner_model = TinyDiffusionEngine()
+    # Same tensors as the base VAE, but a different module object.
+    refiner_model.first_stage_model.load_state_dict(base.model.first_stage_model.state_dict(), assign=True)
+    # Same values as the base conditioner, but separate tensors: not shared, since values are not compared.
+    refiner_model.conditioner.load_state_dict(base.model.conditioner.state_dict())
+    refiner_conditioner = refiner_model.conditioner
+
+    refiner = SamplingPipeline.from_shared(base, refiner_model)
+    assert refiner.model.first_stage_model is base.model.first_stage_model
+    assert refiner.model.conditioner is refiner_conditioner
+    assert refiner.model.model is not base.model.model
+    assert refiner.device == base.device
+    assert refiner.use_fp16 == base.use_fp16
+
+    # The same module object is always shared.
+    refiner_model = TinyDiffusionEngine()
+    refiner_model.conditioner = base.model.conditioner
+    refiner = SamplingPipeline.from_shared(base, refiner_model)
+    assert refiner.model.conditioner is base.model.conditioner
+    assert refiner.model.first_stage_model is not base.model.first_stage_model
@@ -0,0 +1,275 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import torch
+
+from nemo.collections.tts.modules.fastpitch import (
+    FastPitchModule,
+    TemporalPredictor,
+    add_conv1d_embedding,
+    average_features,
+    average_features_1d,
+)
+from nemo.collections.tts.modules.transformer import FFTransformerDecoder, FFTransformerEncoder
+
+
+@pytest.fixture
+def fastpitch_module():
+    torch.manual_seed(777)
+    hidden_dim, n_mel_channels = 32, 20
+    transformer_kwargs = dict(
+        n_layer=2, n_head=1, d_model=hidden_dim, d_head=16, d_inner=64, kernel_size=3, dropout=0.0, dropatt=0.0
+    )
+    encoder = FFTransformerEncoder(**transformer_kwargs, dropemb=0.0, d_embed=hidden_dim, n_embed=50, padding_idx=0)
+    decoder = FFTransformerDecoder(**transformer_kwargs, dropemb=0.0)
+    module = FastPitchModule(
+        encoder_module=encoder,
+        decoder_module=decoder,
+        duration_predictor=TemporalPredictor(hidden_dim, 16, kernel_size=3, dropout=0.0),
+        pitch_predictor=TemporalPredictor(hidden_dim, 16, kernel_size=3, dropout=0.0),
+        energy_predictor=TemporalPredictor(hidden_dim, 16, kernel_size=3, dropout=0.0),
+        aligner=None,
+        speaker_encoder=None,
+        n_speakers=3,
+        symbols_embedding_dim=hidden_dim,
+        pitch_embedding_kernel_size=3,
+        energy_embedding_kernel_size=3,
+        n_mel_channels=n_mel_channels,
+        min_token_duration=2,
+    )
+    return module.eval()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("kernel_size", [1, 3, 5])
+@pytest.mark.parametrize("bias", [True, False])
+def test_add_conv1d_embedding(kernel_size: int, bias: bool):
+    torch.manual_seed(777)
+    batch_size, num_tokens, hidden_dim = 3, 11, 16
+    conv = torch.nn.Conv1d(1, hidden_dim, kernel_size=kernel_size, padding=(kernel_size - 1) // 2, bias=bias)
+    enc = torch.randn([batch_size, num_tokens, hidden_dim], requires_grad=True)
+    values = torch.randn([batch_size, num_tokens], requires_grad=True)
+
+    out = add_conv1d_embedding(enc, values, conv)
+    expected = enc + conv(values.unsqueeze(1)).transpose(1, 2)
+    assert torch.allclose(out, expected, atol=1e-5)
+
+    # test backward
+    scales = torch.rand_like(out)
+    inputs = [enc, values] + list(conv.parameters())
+    grads = torch.autograd.grad((scales * out).sum(), inputs)
+    grads_expected = torch.autograd.grad((scales * expected).sum(), inputs)
+    for grad, grad_expected in zip(grads, grads_expected):
+        assert torch.allclose(grad, grad_expected, atol=1e-5)
+
+
+def _weight_norm_conv1d(**kwargs):
+    return torch.nn.utils.parametrizations.weight_norm(torch.nn.Conv1d(1, 16, **kwargs))
+
+
+def _legacy_weight_norm_conv1d(**kwargs):
+    return torch.nn.utils.weight_norm(torch.nn.Conv1d(1, 16, **kwargs))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "make_conv,kwargs",
+    [
+        (_weight_norm_conv1d, dict(kernel_size=3, padding=1)),
+        (_legacy_weight_norm_conv1d, dict(kernel_size=3, padding=1)),
+        (torch.nn.Conv1d, dict(in_channels=1, out_channels=16, kernel_size=3, padding=2, dilation=2)),
+        (torch.nn.Conv1d, dict(in_channels=1, out_channels=16, kernel_size=4, padding="same")),
+        (torch.nn.Conv1d, dict(in_channels=1, out_channels=16, kernel_size=3, padding=1, padding_mode="reflect")),
+    ],
+)
+def test_add_conv1d_embedding_fallback(make_conv, kwargs: dict):
+    torch.manual_seed(777)
+    conv = make_conv(**kwargs)
+    enc = torch.randn([3, 11, 16])
+    values = torch.randn([3, 11])
+    if make_conv is _legacy_weight_norm_conv1d:
+        # The weight is only recomputed from weight_g and weight_v in the forward pre-hook
+        with torch.no_grad():
+            conv.weight_g.mul_(2.0)
+
+    out = add_conv1d_embedding(enc, values, conv)
+    assert torch.allclose(out, enc + conv(values.unsqueeze(1)).transpose(1, 2), atol=1e-5)
+
+
+@pytest.mark.unit
+def test_add_conv1d_embedding_forward_hook():
+    conv = torch.nn.Conv1d(1, 16, kernel_size=3, padding=1)
+    calls = []
+    conv.register_forward_hook(lambda module, inputs, output: calls.append(output.shape))
+
+    add_conv1d_embedding(torch.randn([3, 11, 16]), torch.randn([3, 11]), conv)
+    assert calls == [torch.Size([3, 16, 11])]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("post_log1p", [False, True])
+def test_average_features_1d(post_log1p: bool):
+    torch.manual_seed(777)
+    batch_size, num_frames = 3, 40
+    # zero durations at the start, in the middle and at the end of the utterances
+    durs = torch.tensor(
+        [[0, 3, 5, 0, 0, 7, 2, 0], [4, 0, 6, 6, 0, 3, 0, 0], [10, 10, 5, 5, 2, 3, 5, 0]], dtype=torch.float
+    )
+    # zeros mimic unvoiced frames, which are excluded from the average; the third token has no voiced frames
+    values = torch.rand([batch_size, num_frames]) * (torch.rand([batch_size, num_frames]) > 0.3)
+    values[:, 3:8] = 0.0
+
+    expected = average_features(values.unsqueeze(1), durs).squeeze(1)
+    if post_log1p:
+        expected = torch.log1p(expected)
+    avg = average_features_1d(values, durs, post_log1p=post_log1p)
+    assert avg.shape == durs.shape
+    assert torch.allclose(avg, expected, atol=1e-6)
+    # tokens without voiced frames average to zero
+    assert torch.all(avg[durs == 0] == 0.0)
+    assert avg[0, 2] == 0.0
+
+
+@pytest.mark.unit
+def test_fastpitch_infer_graphed_cpu_fallback(fastpitch_module):
+    torch.manual_seed(777)
+    text = torch.randint(1, 50, [2, 9])
+    text[1, 6:] = 0
+    pitch = torch.randn([2, 9])
+    speaker = torch.tensor([0, 2])
+
+    with torch.inference_mode():
+        expected = fastpitch_module.infer(text=text, pitch=pitch, speaker=speaker, pace=1.2)
+        outputs = fastpitch_module.infer_graphed(text=text, pitch=pitch, speaker=speaker, pace=1.2)
+    assert len(outputs) == len(expected)
+    for output, output_expected in zip(outputs, expected):
+        if output_expected is None:
+            assert output is None
+        else:
+            assert torch.equal(output, output_expected)
+    assert not fastpitch_module._cuda_graphs
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("batch_size", [1, 3])
+def test_fastpitch_infer_bucketed(fastpitch_module, batch_size: int):
+    # The stages of infer_graphed run eagerly on inputs padded to the buckets, which must not change the outputs
+    torch.manual_seed(777)
+    text = torch.randint(1, 50, [batch_size, 9])
+    pitch = torch.randn([batch_size, 9])
+    speaker = torch.randint(0, 3, [batch_size])
+
+    with torch.inference_mode():
+        expected = fastpitch_module.infer(text=text, pitch=pitch, speaker=speaker, pace=1.2)
+        outputs = fastpitch_module._infer_bucketed(
+            text=text,
+            pitch=pitch,
+            speaker=speaker,
+            pace=1.2,
+            min_text_bucket=16,
+            min_spec_bucket=128,
+            run_stage=lambda key, fn, *args: fn(*args),
+        )
+    spect, dec_lens, durs_predicted, log_durs_predicted, pitch_predicted, volume_extended = outputs
+    assert torch.equal(dec_lens, expected[1])
+    assert torch.equal(durs_predicted, expected[2])
+    assert spect.shape == expected[0].shape
+    for output, output_expected in zip([spect, log_durs_predicted, pitch_predicted], expected[0:1] + expected[3:5]):
+        assert torch.allclose(output, output_expected, atol=1e-5)
+    assert volume_extended is None
+
+
+@pytest.mark.unit
+def test_fastpitch_cuda_graphs_reset(fastpitch_module):
+    # Captured graphs point to the parameter storage, so casting or moving the module drops them
+    fastpitch_module._cuda_graphs["graph"] = object()
+    fastpitch_module.to(torch.float64)
+    assert not fastpitch_module._cuda_graphs
+
+    fastpitch_module._cuda_graphs["graph"] = object()
+    fastpitch_module.reset_cuda_graphs()
+    assert not fastpitch_module._cuda_graphs
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "device_type",
+    [
+        "cpu",
+        pytest.param("cuda", marks=pytest.mark.skipif(not torch.cuda.is_available(), reason="CUDA is unavailable")),
+    ],
+)
+def test_fastpitch_infer_batch(fastpitch_module, device_type: str):
+    device = torch.device(device_type)
+    fastpitch_module = fastpitch_module.to(device)
+    texts = [torch.randint(1, 50, [length], device=device) for length in (5, 9, 3)]
+    speaker = torch.tensor([0, 2, 1], device=device)
+
+    with torch.inference_mode():
+        spects, durs = fastpitch_module.infer_batch(texts, speaker=speaker)
+        for i, text in enumerate(texts):
+            spect_expected, dec_lens_expected, durs_expected, *_ = fastpitch_module.infer(
+                text=text[None], pitch=torch.zeros([1, len(text)], device=device), speaker=speaker[i : i + 1]
+            )
+            assert spects[i].shape == (20, dec_lens_expected[0])
+            assert torch.allclose(spects[i], spect_expected[0], atol=1e-5)
+            assert torch.equal(durs[i], durs_expected[0])
+
+
+@pytest.mark.unit
+def test_fastpitch_infer_autocast_cpu(fastpitch_module):
+    torch.manual_seed(777)
+    text = torch.randint(1, 50, [2, 9])
+    text[1, 6:] = 0
+    pitch = torch.randn([2, 9])
+    speaker = torch.tensor([0, 2])
+
+    encoder_dtypes = []
+    fastpitch_module.encoder.layers[0].dec_attn.qkv_net.register_forward_hook(
+        lambda module, inputs, output: encoder_dtypes.append(output.dtype)
+    )
+
+    with torch.inference_mode():
+        expected = fastpitch_module.infer(text=text, pitch=pitch, speaker=speaker)
+        spect, dec_lens, durs_predicted, log_durs_predicted, pitch_predicted, _ = fastpitch_module.infer(
+            text=text, pitch=pitch, speaker=speaker, autocast_dtype=torch.bfloat16
+        )
+    assert encoder_dtypes == [torch.float32, torch.bfloat16]
+    # Durations, pitch and the output projection keep the parameter dtype
+    for output in (spect, durs_predicted, log_durs_predicted, pitch_predicted):
+        assert output.dtype == torch.float32
+        assert torch.isfinite(output).all()
+    assert spect.shape[:2] == expected[0].shape[:2]
+    assert spect.shape[2] == dec_lens.max()
+
+
+@pytest.mark.unit
+def test_fastpitch_infer_outer_autocast_cpu(fastpitch_module):
+    # Without autocast_dtype, infer keeps the precision set up by the caller (e.g. export with autocast, AMP predict)
+    torch.manual_seed(777)
+    text = torch.randint(1, 50, [2, 9])
+    pitch = torch.randn([2, 9])
+    speaker = torch.tensor([0, 2])
+    dtypes = []
+    fastpitch_module.encoder.layers[0].dec_attn.qkv_net.register_forward_hook(
+        lambda module, inputs, output: dtypes.append(output.dtype)
+    )
+    fastpitch_module.proj.register_forward_hook(lambda module, inputs, output: dtypes.append(output.dtype))
+
+    with torch.inference_mode(), torch.autocast("cpu", dtype=torch.bfloat16):
+        spect, *_ = fastpitch_module.infer(text=text, pitch=pitch, speaker=speaker)
+    # The encoder and the output projection both run in bf16
+    assert dtypes == [torch.bfloat16, torch.bfloat16]
+    assert spect.dtype == torch.float32
@@ -0,0 +1,86 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+import sys
+
+import pytest
+import torch
+
+from nemo.collections.tts.modules.fastpitch import average_features
+from nemo.core.utils.optional_libs import TRITON_AVAILABLE
+
+if TRITON_AVAILABLE:
+    from nemo.collections.tts.parts.utils.average_features_triton import average_features_triton
+
+# With TRITON_INTERPRET=1 the kernels run on CPU tensors, see test_average_features_triton_interpreter
+TRITON_INTERPRET = os.environ.get("TRITON_INTERPRET") == "1"
+
+
+@pytest.mark.skipif(not TRITON_AVAILABLE, reason="Triton is not installed, skipping average features tests")
+@pytest.mark.skipif(not torch.cuda.is_available() and not TRITON_INTERPRET, reason="CUDA is unavailable")
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "batch_size,num_features,num_frames,num_tokens", [(1, 1, 10, 3), (2, 1, 300, 40), (3, 2, 50, 7)]
+)
+@pytest.mark.parametrize("post_log1p", [False, True])
+def test_average_features_triton(
+    batch_size: int, num_features: int, num_frames: int, num_tokens: int, post_log1p: bool
+):
+    """
+    Test Triton-based implementation using the cumsum/gather-based implementation on CPU as the etalon.
+    """
+    device = torch.device("cpu" if TRITON_INTERPRET else "cuda")
+    torch.manual_seed(777)
+    durs = torch.randint(0, 2 * num_frames // num_tokens, [batch_size, num_tokens]).float()
+    durs = torch.where(torch.cumsum(durs, dim=1) > num_frames, torch.zeros_like(durs), durs)
+    # zeros mimic unvoiced frames, which are excluded from the average
+    values = torch.randn([batch_size, num_features, num_frames])
+    values = values * (torch.rand_like(values) > 0.3)
+    if post_log1p:
+        # log(1 + x) is used for non-negative features (energy)
+        values = values.abs()
+
+    values_etalon = values.clone().requires_grad_(True)
+    values_triton = values.clone().to(device).requires_grad_(True)
+    avg_etalon = average_features(values_etalon, durs)
+    if post_log1p:
+        avg_etalon = torch.log(1.0 + avg_etalon)
+    avg_triton = average_features_triton(values_triton, durs.to(device), post_log1p=post_log1p)
+    assert torch.allclose(avg_triton.cpu(), avg_etalon, atol=1e-5)
+
+    # test backward
+    scales = torch.rand_like(avg_etalon)
+    (scales * avg_etalon).sum().backward()
+    (scales.to(device) * avg_triton).sum().backward()
+    assert torch.allclose(values_triton.grad.cpu(), values_etalon.grad, atol=1e-5)
+
+
+@pytest.mark.skipif(not TRITON_AVAILABLE, reason="Triton is not installed, skipping average features tests")
+@pytest.mark.skipif(TRITON_INTERPRET, reason="Already running in the Triton interpreter")
+@pytest.mark.unit
+def test_average_features_triton_interpreter():
+    """
+    Runs the test above on CPU in the Triton interpreter, so that the kernels are also checked without a GPU.
+    The interpreter is selected when Triton is imported, hence the separate process.
+    """
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", f"{__file__}::test_average_features_triton"],
+        env={**os.environ, "TRITON_INTERPRET": "1"},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "skipped" not in result.stdout, result.stdout
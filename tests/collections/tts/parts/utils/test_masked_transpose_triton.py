@@ -0,0 +1,73 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+import sys
+
+import pytest
+import torch
+
+from nemo.core.utils.optional_libs import TRITON_AVAILABLE
+
+if TRITON_AVAILABLE:
+    from nemo.collections.tts.parts.utils.masked_transpose_triton import masked_transpose_triton
+
+# With TRITON_INTERPRET=1 the kernels run on CPU tensors, see test_masked_transpose_triton_interpreter
+TRITON_INTERPRET = os.environ.get("TRITON_INTERPRET") == "1"
+
+
+@pytest.mark.skipif(not TRITON_AVAILABLE, reason="Triton is not installed, skipping masked transpose tests")
+@pytest.mark.skipif(not torch.cuda.is_available() and not TRITON_INTERPRET, reason="CUDA is unavailable")
+@pytest.mark.unit
+@pytest.mark.parametrize("batch_size,max_len,hidden_dim", [(1, 5, 3), (2, 70, 384), (3, 33, 65)])
+def test_masked_transpose_triton(batch_size: int, max_len: int, hidden_dim: int):
+    """
+    Test Triton-based implementation using multiplication and transpose on CPU as the etalon.
+    """
+    device = torch.device("cpu" if TRITON_INTERPRET else "cuda")
+    torch.manual_seed(777)
+    values = torch.randn([batch_size, max_len, hidden_dim])
+    mask = torch.rand([batch_size, max_len, 1]) > 0.3
+
+    values_etalon = values.clone().requires_grad_(True)
+    values_triton = values.clone().to(device).requires_grad_(True)
+    out_etalon = (values_etalon * mask).transpose(1, 2)
+    out_triton = masked_transpose_triton(values_triton, mask.to(device))
+    assert out_triton.is_contiguous()
+    assert torch.allclose(out_triton.cpu(), out_etalon, atol=1e-5)
+
+    # test backward
+    scales = torch.rand_like(out_etalon)
+    (scales * out_etalon).sum().backward()
+    (scales.to(device) * out_triton).sum().backward()
+    assert torch.allclose(values_triton.grad.cpu(), values_etalon.grad, atol=1e-5)
+
+
+@pytest.mark.skipif(not TRITON_AVAILABLE, reason="Triton is not installed, skipping masked transpose tests")
+@pytest.mark.skipif(TRITON_INTERPRET, reason="Already running in the Triton interpreter")
+@pytest.mark.unit
+def test_masked_transpose_triton_interpreter():
+    """
+    Runs the test above on CPU in the Triton interpreter, so that the kernel is also checked without a GPU.
+    The interpreter is selected when Triton is imported, hence the separate process.
+    """
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", f"{__file__}::test_masked_transpose_triton"],
+        env={**os.environ, "TRITON_INTERPRET": "1"},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "skipped" not in result.stdout, result.stdout
@@ -0,0 +1,76 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+import sys
+
+import pytest
+import torch
+
+from nemo.collections.tts.parts.utils.helpers import regulate_len
+from nemo.core.utils.optional_libs import TRITON_AVAILABLE
+
+if TRITON_AVAILABLE:
+    from nemo.collections.tts.parts.utils.regulate_len_triton import regulate_len_triton
+
+# With TRITON_INTERPRET=1 the kernels run on CPU tensors, see test_regulate_len_triton_interpreter
+TRITON_INTERPRET = os.environ.get("TRITON_INTERPRET") == "1"
+
+
+@pytest.mark.skipif(not TRITON_AVAILABLE, reason="Triton is not installed, skipping regulate_len tests")
+@pytest.mark.skipif(not torch.cuda.is_available() and not TRITON_INTERPRET, reason="CUDA is unavailable")
+@pytest.mark.unit
+@pytest.mark.parametrize("batch_size,num_tokens,hidden_dim", [(1, 3, 5), (2, 40, 384), (3, 7, 1500)])
+@pytest.mark.parametrize("pace", [1.0, 1.3])
+def test_regulate_len_triton(batch_size: int, num_tokens: int, hidden_dim: int, pace: float):
+    """
+    Test Triton-based implementation using the matmul-based implementation on CPU as the etalon.
+    """
+    device = torch.device("cpu" if TRITON_INTERPRET else "cuda")
+    torch.manual_seed(777)
+    durs = torch.randint(0, 10, [batch_size, num_tokens]).float()
+    durs[0, -1] = 0.0  # trailing zero durations
+    enc_out = torch.randn([batch_size, num_tokens, hidden_dim])
+
+    enc_out_etalon = enc_out.clone().requires_grad_(True)
+    enc_out_triton = enc_out.clone().to(device).requires_grad_(True)
+    out_etalon, dec_lens = regulate_len(durs, enc_out_etalon, pace)
+    reps = ((durs / pace) + 0.5).floor().long()
+    out_triton = regulate_len_triton(enc_out_triton, reps.to(device), int(dec_lens.max()))
+    assert torch.allclose(out_triton.cpu(), out_etalon, atol=1e-5)
+
+    # test backward
+    scales = torch.rand_like(out_etalon)
+    (scales * out_etalon).sum().backward()
+    (scales.to(device) * out_triton).sum().backward()
+    assert torch.allclose(enc_out_triton.grad.cpu(), enc_out_etalon.grad, atol=1e-5)
+
+
+@pytest.mark.skipif(not TRITON_AVAILABLE, reason="Triton is not installed, skipping regulate_len tests")
+@pytest.mark.skipif(TRITON_INTERPRET, reason="Already running in the Triton interpreter")
+@pytest.mark.unit
+def test_regulate_len_triton_interpreter():
+    """
+    Runs the test above on CPU in the Triton interpreter, so that the kernels are also checked without a GPU.
+    The interpreter is selected when Triton is imported, hence the separate process.
+    """
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", f"{__file__}::test_regulate_len_triton"],
+        env={**os.environ, "TRITON_INTERPRET": "1"},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "skipped" not in result.stdout, result.stdout